@@ -0,0 +1,7 @@
+"""Benchmarks for the public diglett functions, run against synthetic data of increasing size.
+
+Usage::
+
+    python -m benchmarks run --sizes 1e3 1e5 1e7 --output new.json
+    python -m benchmarks compare old.json new.json
+"""
@@ -0,0 +1,136 @@
+"""Command line entry point: ``python -m benchmarks {run,compare}``."""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from diglett.utils import profile_call
+from .cases import CASES
+
+KEY_COLS = ['case', 'n_rows', 'cardinality', 'null_rate', 'skew']
+METRIC_COLS = ['wall_sec', 'cpu_sec', 'peak_mem_bytes']
+
+
+def _version() -> str:
+    """Return the installed version of diglett, if known."""
+    try:
+        from importlib.metadata import version
+
+        return version('diglett')
+    except Exception:
+        return 'unknown'
+
+
+def run(
+    sizes: List[int],
+    cases: List[str],
+    cardinality: int,
+    null_rate: float,
+    skew: float,
+    repeat: int,
+    trace_memory: bool,
+) -> Dict[str, Any]:
+    """Run each case at each size, and return the results with some metadata about the environment."""
+
+    results = []
+    for n_rows in sizes:
+        for name in cases:
+            func, args, kwargs = CASES[name](n_rows, cardinality, null_rate, skew)
+            records = []
+            for _ in range(repeat):
+                # silence the printed/displayed diagnostics of functions like verbose_merge()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _, record = profile_call(func, args, kwargs, trace_memory=trace_memory)
+                records.append(record)
+
+            best = min(records, key=lambda r: r['wall_sec'])
+            result = dict(zip(KEY_COLS, [name, n_rows, cardinality, null_rate, skew]))
+            result.update({col: best[col] for col in METRIC_COLS + ['mem_in_bytes', 'mem_out_bytes']})
+            result['wall_sec_median'] = float(np.median([r['wall_sec'] for r in records]))
+            results.append(result)
+            print(f'{name:<24} {n_rows:>12,} rows  {best["wall_sec"]:>9.3f}s', file=sys.stderr)
+
+    return {
+        'meta': {
+            'diglett': _version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'python': platform.python_version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> pd.DataFrame:
+    """Join two sets of results on their parameters, and compute the new/old ratio of each metric."""
+
+    old_df = pd.DataFrame(old['results']).set_index(KEY_COLS)[METRIC_COLS]
+    new_df = pd.DataFrame(new['results']).set_index(KEY_COLS)[METRIC_COLS]
+    df = old_df.join(new_df, lsuffix='_old', rsuffix='_new', how='inner')
+
+    for col in METRIC_COLS:
+        df[f'{col}_ratio'] = df[f'{col}_new'] / df[f'{col}_old']
+    df['regression'] = (df[[f'{col}_ratio' for col in ['wall_sec', 'peak_mem_bytes']]] > 1 + threshold).any(axis=1)
+
+    return df
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse command line arguments and run the requested subcommand."""
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run benchmarks and save the results as JSON.')
+    run_parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e5, 1e7])
+    run_parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    run_parser.add_argument('--cardinality', type=int, default=1000)
+    run_parser.add_argument('--null-rate', type=float, default=0.0)
+    run_parser.add_argument('--skew', type=float, default=1.0)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--no-trace-memory', action='store_true', help='Skip tracemalloc, for faster runs.')
+    run_parser.add_argument('--output', default='benchmark.json')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two JSON result files.')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='Tolerated relative slowdown.')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        output = run(
+            sizes=[int(n) for n in args.sizes],
+            cases=args.cases,
+            cardinality=args.cardinality,
+            null_rate=args.null_rate,
+            skew=args.skew,
+            repeat=args.repeat,
+            trace_memory=not args.no_trace_memory,
+        )
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+        return 0
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    df = compare(old, new, args.threshold)
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 200):
+        print(df[[f'{col}_ratio' for col in METRIC_COLS] + ['regression']].round(3))
+    return int(df['regression'].any())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
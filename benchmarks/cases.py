@@ -0,0 +1,118 @@
+"""Benchmark cases: how to build the input for each public function, and how to call it."""
+
+from typing import Any, Callable, Dict, Tuple
+
+from diglett.eda import show_top_n, summarize, tabulate
+from diglett.group import group_other
+from diglett.insist import CheckSuite
+from diglett.join import verbose_merge
+from diglett.output import render_table
+from diglett.transform import complete_panel, fillnas, multi_moving_average, winsorize, winsorize_df
+from . import data
+
+# Each case maps data parameters → (function, positional args, keyword args)
+Case = Callable[..., Tuple[Callable, Tuple[Any, ...], Dict[str, Any]]]
+
+
+def _group_other(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark group_other() on (dim_A, dim_B, num_) input."""
+    df = data.make_dims(n_rows, cardinality, null_rate, skew)
+    return group_other, (df,), {'n': 10}
+
+
+def _show_top_n(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark show_top_n() on (dim_A, num_) input."""
+    df = data.make_dims(n_rows, cardinality, null_rate, skew)[['dim_A', 'num_']]
+    return show_top_n, (df,), {'n': 10, 'show_output': False}
+
+
+def _tabulate(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark tabulate() on (dim_A, dim_B, num_) input, with dim_A capped at 100 values."""
+    df = data.make_dims(n_rows, min(cardinality, 100), null_rate, skew)
+    return tabulate, (df,), {'return_output': True}
+
+
+def _summarize(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark summarize() on mixed-type input."""
+    df = data.make_mixed(n_rows, cardinality, null_rate, skew)
+    return summarize, (df,), {'return_output': True}
+
+
+def _verbose_merge(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark verbose_merge() of a fact table against a smaller dimension table."""
+    fact, dim = data.make_merge_pair(n_rows, cardinality, null_rate, skew)
+    return verbose_merge, (fact, dim), {'left_on': 'key', 'right_on': 'key', 'how': 'left'}
+
+
+def _fillnas(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark fillnas() on a frame of float columns."""
+    df = data.make_wide(n_rows, null_rate=max(null_rate, 0.1))
+    return fillnas, (df,), {}
+
+
+def _winsorize(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark winsorize() on a single float Series."""
+    srs = data.make_wide(n_rows, n_cols=1, null_rate=null_rate)['num_0']
+    return winsorize, (srs,), {'verbose': False}
+
+
+def _winsorize_df(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark winsorize_df() on a frame of float columns."""
+    df = data.make_wide(n_rows, null_rate=null_rate)
+    return winsorize_df, (df,), {}
+
+
+def _multi_moving_average(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark multi_moving_average() on a (ds, dim) panel."""
+    df = data.make_panel(n_rows, cardinality, null_rate)
+    return multi_moving_average, (df,), {'window': 7}
+
+
+def _multi_moving_average_wide(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark multi_moving_average() with several windows and spans, from a single sort."""
+    df = data.make_panel(n_rows, cardinality, null_rate)
+    return multi_moving_average, (df,), {'window': [7, 28, 90], 'spans': [7, 28]}
+
+
+def _complete_panel(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark complete_panel() on a (ds, dim) panel with half of its rows missing."""
+    df = data.make_panel(n_rows, cardinality, null_rate)
+    return complete_panel, (df.iloc[::2],), {}
+
+
+def _check_suite(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark a CheckSuite of several checks sharing the same columns."""
+    df = data.make_mixed(n_rows, cardinality, null_rate, skew)
+    suite = (
+        CheckSuite()
+        .less_than_pct_null()
+        .no_nulls(['n_int'])
+        .more_than_pct_unique('dim_A')
+        .more_than_pct_unique('n_int')
+        .average_greater_than('x_float', 0)
+        .values_between('n_int', 0, cardinality)
+    )
+    return suite.run, (df,), {}
+
+
+def _render_table(n_rows: int, cardinality: int, null_rate: float, skew: float) -> Tuple:
+    """Benchmark render_table() of (dim_A, dim_B, num_) input as HTML."""
+    df = data.make_dims(n_rows, cardinality, null_rate, skew)
+    return render_table, (df,), {}
+
+
+CASES: Dict[str, Case] = {
+    'group_other': _group_other,
+    'show_top_n': _show_top_n,
+    'tabulate': _tabulate,
+    'summarize': _summarize,
+    'verbose_merge': _verbose_merge,
+    'fillnas': _fillnas,
+    'winsorize': _winsorize,
+    'winsorize_df': _winsorize_df,
+    'multi_moving_average': _multi_moving_average,
+    'multi_moving_average_wide': _multi_moving_average_wide,
+    'complete_panel': _complete_panel,
+    'check_suite': _check_suite,
+    'render_table': _render_table,
+}
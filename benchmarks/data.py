@@ -0,0 +1,119 @@
+"""Generate synthetic data with controllable size, cardinality, null rate and skew."""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _categories(
+    rng: np.random.Generator, n_rows: int, cardinality: int, skew: float, prefix: str
+) -> np.ndarray:
+    """Draw n_rows string labels from cardinality categories, with Zipf-like frequencies.
+
+    A skew of 0 is uniform, while larger values concentrate rows in the first few categories.
+    """
+    weights = 1 / np.arange(1, cardinality + 1) ** skew
+    codes = rng.choice(cardinality, size=n_rows, p=weights / weights.sum())
+    labels = np.array([f'{prefix}{i}' for i in range(cardinality)], dtype=object)
+    return labels[codes]
+
+
+def _add_nulls(rng: np.random.Generator, values: np.ndarray, null_rate: float) -> np.ndarray:
+    """Replace a random fraction of values with nulls."""
+    if null_rate <= 0:
+        return values
+    values = values.astype('float64') if values.dtype.kind in 'iu' else values.copy()
+    values[rng.random(values.shape[0]) < null_rate] = None
+    return values
+
+
+def make_dims(
+    n_rows: int,
+    cardinality: int = 1000,
+    null_rate: float = 0.0,
+    skew: float = 1.0,
+    seed: Optional[int] = 42,
+) -> pd.DataFrame:
+    """Create a "group by count" style DataFrame with columns: (dim_A, dim_B, num_)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            'dim_A': _add_nulls(rng, _categories(rng, n_rows, cardinality, skew, 'a'), null_rate),
+            'dim_B': _categories(rng, n_rows, max(cardinality // 10, 1), skew, 'b'),
+            'num_': rng.integers(1, 1000, size=n_rows),
+        }
+    )
+
+
+def make_wide(
+    n_rows: int,
+    n_cols: int = 20,
+    null_rate: float = 0.0,
+    seed: Optional[int] = 42,
+) -> pd.DataFrame:
+    """Create a DataFrame of float columns with a given proportion of nulls."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {f'num_{i}': _add_nulls(rng, rng.exponential(size=n_rows), null_rate) for i in range(n_cols)}
+    )
+
+
+def make_mixed(
+    n_rows: int,
+    cardinality: int = 1000,
+    null_rate: float = 0.0,
+    skew: float = 1.0,
+    seed: Optional[int] = 42,
+) -> pd.DataFrame:
+    """Create a DataFrame with a mix of string, integer and float columns, as input for summarize()."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            'dim_A': _add_nulls(rng, _categories(rng, n_rows, cardinality, skew, 'a'), null_rate),
+            'n_int': rng.integers(0, cardinality, size=n_rows),
+            'x_float': _add_nulls(rng, rng.normal(size=n_rows), null_rate),
+        }
+    )
+
+
+def make_merge_pair(
+    n_rows: int,
+    cardinality: int = 1000,
+    null_rate: float = 0.0,
+    skew: float = 1.0,
+    seed: Optional[int] = 42,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Create a (fact, dimension) pair of DataFrames sharing a key column, about 90% of which match."""
+    rng = np.random.default_rng(seed)
+    fact = pd.DataFrame(
+        {
+            'key': _add_nulls(rng, _categories(rng, n_rows, cardinality, skew, 'k'), null_rate),
+            'num_': rng.integers(1, 1000, size=n_rows),
+        }
+    )
+    keys = np.array([f'k{i}' for i in range(cardinality)], dtype=object)
+    dim = pd.DataFrame({'key': keys[rng.random(cardinality) < 0.9], 'attr': 'x'})
+    return fact, dim
+
+
+def make_panel(
+    n_rows: int,
+    cardinality: int = 1000,
+    null_rate: float = 0.0,
+    seed: Optional[int] = 42,
+) -> pd.DataFrame:
+    """Create a (ds, dim) indexed panel with two numeric columns, as input for multi_moving_average()."""
+    rng = np.random.default_rng(seed)
+    n_dims = min(cardinality, n_rows)
+    n_dates = max(n_rows // n_dims, 1)
+    index = pd.MultiIndex.from_product(
+        [pd.date_range('2020-01-01', periods=n_dates), [f'd{i}' for i in range(n_dims)]], names=['ds', 'dim']
+    )
+    return pd.DataFrame(
+        {
+            'num_A': _add_nulls(rng, rng.exponential(size=len(index)), null_rate),
+            'num_B': rng.integers(0, 100, size=len(index)),
+        },
+        index=index,
+    )
@@ -1 +1,18 @@
 """ Boilerplate tools for routine data analysis. """
+
+import importlib
+from typing import Any, List
+
+__all__ = ['eda', 'group', 'insist', 'join', 'output', 'pipeline', 'sketch', 'transform', 'utils']
+
+
+def __getattr__(name: str) -> Any:
+    """Import submodules lazily on first access, so that `import diglett` stays cheap."""
+    if name in __all__:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> List[str]:
+    """List submodules alongside the module attributes, for tab-completion."""
+    return sorted(set(globals()) | set(__all__))
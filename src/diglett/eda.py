@@ -4,16 +4,42 @@ These help understand the nature of some data, mostly by displaying stuff, not r
 """
 
 from functools import singledispatch
-from typing import Optional, Union
+from typing import List, Optional, Union
 
-from IPython.core.display import display
 import numpy as np
 import pandas as pd
 
 from .group import group_other
-from .output import format_helper
+from .output import display, format_helper
 from .transform import reindex_by_sum
 
+NULL_LABEL = '< NULL >'
+
+
+def _to_labels(values: Union[pd.Series, pd.Index]) -> pd.Categorical:
+    """Encode dimension values as a Categorical of string labels, with nulls as a dedicated category.
+
+    Only the distinct values are converted to strings, so this is much cheaper than .astype(str) on
+    long columns, and free for columns which are already categorical.
+
+    The codes are not aggregated with np.bincount(): group_other() ranks input rows rather than distinct
+    values (rows need not be unique per dimension), using a partial sort of the numeric column alone. Only
+    the top N rows plus "other" then reach groupby(), so grouping on labels costs next to nothing.
+    """
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categorical = pd.Categorical(values)
+        codes, uniques = categorical.codes, categorical.categories
+    else:
+        codes, uniques = pd.factorize(values)
+
+    # add nulls as the last category, then merge any categories which map to the same string
+    labels = np.append(uniques.astype(str).to_numpy(dtype=object), NULL_LABEL)
+    codes = np.where(codes == -1, labels.shape[0] - 1, codes)
+    label_codes, unique_labels = pd.factorize(labels)
+
+    return pd.Categorical.from_codes(label_codes[codes], categories=unique_labels)
+
 
 @singledispatch
 def show_top_n(
@@ -21,6 +47,7 @@ def show_top_n(
     n: int = 10,
     show_output: bool = True,
     other_val: str = '…',
+    partition_by: Optional[List[str]] = None,
 ) -> Optional[Union[pd.Series, pd.DataFrame]]:
     """Cleanly display the top N values from a "group by count" SQL output.
 
@@ -29,6 +56,8 @@ def show_top_n(
         n: The number of rows to show, before grouping remainder as "other".
         show_output: If true, display result "nicely", else return the actual df.
         other_val: The value to which values beyond the top N are grouped.
+        partition_by: Dimension columns within which to show the top N separately (DataFrame input only).
+            Percentages are then relative to the total of each partition.
 
     """
     raise NotImplementedError
@@ -40,11 +69,30 @@ def _show_top_n_df(
     n: int = 10,
     show_output: bool = True,
     other_val: str = '…',
+    partition_by: Optional[List[str]] = None,
 ) -> Optional[pd.DataFrame]:
     """Implement show_top_n() for DataFrame input."""
 
-    df = df.copy()
-    df.iloc[:, :-1] = df.iloc[:, :-1].astype(str).fillna('< NULL >')
+    df = df.assign(**{col: _to_labels(df[col]) for col in df.columns[:-1]})
+
+    if partition_by:
+        df = df.pipe(group_other, n=n, other_val=other_val, partition_by=partition_by)
+        dim_cols = [col for col in df.columns[:-1] if col not in partition_by]
+        num_col = df.columns[-1]
+
+        # Force OTHER category to appear at the bottom of each partition
+        is_other = (df[dim_cols] == other_val).all(axis=1)
+        df = (
+            df.assign(_is_other=is_other)
+            .sort_values(by=partition_by + ['_is_other'], kind='mergesort')
+            .drop(columns='_is_other')
+            .assign(pct_=lambda x: x[num_col] / x.groupby(partition_by)[num_col].transform('sum'))
+            .reset_index(drop=True)
+        )
+        if show_output:
+            format_helper(df)
+            return None
+        return df
 
     df = df.pipe(group_other, n=n, other_val=other_val).pipe(lambda x: x.set_index(x.columns[0]))
 
@@ -72,7 +120,7 @@ def _show_top_n_srs(
     """Implement show_top_n() for Series input."""
 
     srs = srs.copy()
-    srs.index = srs.index.astype(str).fillna('< NULL >')
+    srs.index = pd.CategoricalIndex(_to_labels(srs.index), name=srs.index.name)
 
     srs = srs.pipe(group_other, n=n, other_val=other_val)
 
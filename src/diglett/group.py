@@ -1,10 +1,61 @@
 """Tools related to df.groupby()."""
 
 from functools import singledispatch
-from typing import Union
+from typing import Iterable, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
+from .sketch import HeavyHitters
+
+
+def _top_n_mask(srs: pd.Series, n: int) -> np.ndarray:
+    """Flag the positions of the N largest values of a Series, using a partial sort rather than a full sort.
+
+    Nulls rank below every other value, as they do when sorting with na_position='last', and ties at the N-th value
+    are broken by first appearance, as they are by a stable sort_values().
+    """
+
+    mask = np.zeros(srs.shape[0], dtype=bool)
+    if n >= srs.shape[0]:
+        mask[:] = True
+        return mask
+    if n <= 0:
+        return mask
+
+    if isinstance(srs.dtype, np.dtype) and srs.dtype.kind in 'iu':
+        mask[_top_n_positions(srs.to_numpy(), n)] = True
+        return mask
+
+    values = srs.to_numpy(dtype='float64', na_value=np.nan)
+    is_null = np.isnan(values)
+    valid_pos = np.flatnonzero(~is_null)
+
+    if n >= valid_pos.shape[0]:
+        # like sort_values(), fill the remaining places with nulls in their original order
+        mask[valid_pos] = True
+        mask[np.flatnonzero(is_null)[: n - valid_pos.shape[0]]] = True
+    else:
+        mask[valid_pos[_top_n_positions(values[valid_pos], n)]] = True
+    return mask
+
+
+def _top_n_positions(values: np.ndarray, n: int) -> np.ndarray:
+    """Find the positions of the N largest values of an array without nulls, keeping the first of any ties."""
+
+    threshold = np.partition(values, values.shape[0] - n)[values.shape[0] - n]
+    is_above = values > threshold
+    ties = np.flatnonzero(values == threshold)[: n - np.count_nonzero(is_above)]
+    return np.concatenate([np.flatnonzero(is_above), ties])
+
+
+def _decategorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Map categorical columns back to their labels, so that groupby() only returns observed values."""
+    cat_cols = df.select_dtypes('category').columns
+    if cat_cols.empty:
+        return df
+    return df.astype({col: object for col in cat_cols})
+
 
 @singledispatch
 def group_other(
@@ -12,6 +63,7 @@ def group_other(
     n: int = 10,
     other_val: str = '…',
     sort_by: str = None,
+    partition_by: Optional[List[str]] = None,
 ):
     """Group the "long-tail" dimensions (beyond top N) of a DataFrame or Series together.
 
@@ -26,6 +78,8 @@ def group_other(
         n: Values beyond this point get grouped as "other".
         other_val: The string with which to represent "other" values.
         sort_by: The column by which to sort the dataframe, before grouping.
+        partition_by: Dimension columns within which to keep the top N separately (DataFrame input only),
+            e.g. the top N products within each country.
 
     """
     raise NotImplementedError
@@ -33,7 +87,11 @@ def group_other(
 
 @group_other.register
 def _group_other_df(
-    df: pd.DataFrame, n: int = 10, other_val: str = '…', sort_by: str = None
+    df: pd.DataFrame,
+    n: int = 10,
+    other_val: str = '…',
+    sort_by: str = None,
+    partition_by: Optional[List[str]] = None,
 ) -> pd.DataFrame:
     """Implement group_other() for DataFrame input."""
 
@@ -43,27 +101,129 @@ def _group_other_df(
 
     if not sort_by:
         sort_by = num_cols[-1]
-    df = df.sort_values(by=sort_by, ascending=False)
 
-    # replace long-tail with "other" placeholder
-    df.iloc[n:, df.columns.get_indexer(cat_cols)] = other_val
+    if partition_by:
+        return _group_other_partitioned(df, n, other_val, sort_by, partition_by, cat_cols, num_cols)
+
+    # only the top N rows keep their dimensions, the long-tail is summed into a single "other" row
+    is_top = _top_n_mask(df[sort_by], n)
+    top = _decategorize(df.loc[is_top])
+    if not is_top.all():
+        other = df.loc[~is_top, num_cols].sum().to_frame().T.astype(df[num_cols].dtypes.to_dict())
+        other[cat_cols] = other_val
+        df = pd.concat([top, other.reindex(df.columns, axis=1)], ignore_index=True)
+    else:
+        df = top
 
     return df.groupby(cat_cols).sum().sort_values(by=sort_by, ascending=False).reset_index()
 
 
+def _group_other_partitioned(
+    df: pd.DataFrame,
+    n: int,
+    other_val: str,
+    sort_by: str,
+    partition_by: List[str],
+    cat_cols: List[str],
+    num_cols: List[str],
+) -> pd.DataFrame:
+    """Implement group_other() within each partition, with a single ranking pass over all partitions."""
+
+    dim_cols = [col for col in cat_cols if col not in partition_by]
+    if not dim_cols:
+        raise ValueError('Expecting at least one dimension column besides partition_by')
+
+    # rank within each partition, with nulls last as in sort_values()
+    rank = df.groupby(partition_by, sort=False)[sort_by].rank(method='first', ascending=False, na_option='bottom')
+    is_top = (rank <= n).to_numpy()
+
+    top = _decategorize(df.loc[is_top])
+    other = df.loc[~is_top, partition_by + num_cols].groupby(partition_by, observed=True).sum().reset_index()
+    other = _decategorize(other)
+    other[dim_cols] = other_val
+
+    return (
+        pd.concat([top, other.reindex(df.columns, axis=1)], ignore_index=True)
+        .groupby(partition_by + dim_cols)
+        .sum()
+        .reset_index()
+        .sort_values(by=partition_by + [sort_by], ascending=[True] * len(partition_by) + [False], kind='mergesort')
+        .reindex(df.columns, axis=1)
+        .reset_index(drop=True)
+    )
+
+
 @group_other.register
 def _group_other_srs(srs: pd.Series, n: int = 10, other_val: str = '…') -> pd.Series:
     """Implement group_other() for a Series input."""
 
     assert srs.dtype.kind == 'i', 'Expecting an int'
 
-    srs = srs.sort_values(ascending=False)
-    idx = srs.index.to_series()
-    idx[n:] = other_val
-    srs.index = idx
+    # only the top N values keep their index, the long-tail is summed into a single "other" value
+    is_top = _top_n_mask(srs, n)
+    top = srs[is_top]
+    if isinstance(top.index, pd.CategoricalIndex):
+        top.index = top.index.astype(object)
+    if not is_top.all():
+        other = pd.Series(
+            [srs[~is_top].sum()], index=pd.Index([other_val], name=srs.index.name), name=srs.name, dtype=srs.dtype
+        )
+        srs = pd.concat([top, other])
+    else:
+        srs = top
 
     return srs.groupby(level=0).sum().sort_values(ascending=False)
 
 
+def group_other_streaming(
+    chunks: Iterable[pd.DataFrame],
+    n: int = 10,
+    other_val: str = '…',
+    sort_by: Optional[str] = None,
+    capacity: int = 1000,
+) -> pd.DataFrame:
+    """Group the "long-tail" dimensions of a table which is read in chunks, with bounded memory.
+
+    Unlike group_other(), only the sort_by column is aggregated, and totals are estimated using a
+    heavy-hitters summary which tracks at most `capacity` dimension values at once. The true total of each
+    row lies within the (lower_, upper_) columns; they are exact unless more than `capacity` values were seen.
+    Rows with a null dimension are dropped, as they are by group_other().
+
+    Args:
+        chunks: An iterable of DataFrames with the same columns, e.g. from pd.read_csv(chunksize=…).
+        n: Values beyond this point get grouped as "other".
+        other_val: The string with which to represent "other" values.
+        sort_by: The numeric column to aggregate. Defaults to the right-most numeric column.
+        capacity: The maximum number of dimension values to track. Higher is more accurate.
+
+    """
+
+    summary = HeavyHitters(capacity=capacity)
+    cat_cols = None
+
+    for chunk in chunks:
+        if cat_cols is None:
+            cat_cols = chunk.select_dtypes(exclude='number').columns.tolist()
+            sort_by = sort_by or chunk.select_dtypes('number').columns[-1]
+        # like groupby() in group_other(), rows with a null dimension are dropped, also from the total
+        totals = chunk.groupby(cat_cols)[sort_by].sum()
+        summary.update(totals, total=totals.sum())
+
+    if cat_cols is None:
+        raise ValueError('Expecting at least one chunk')
+
+    top = summary.top(n)
+    df = top.rename(sort_by).reset_index().assign(lower_=top.to_numpy(), upper_=top.to_numpy() + summary.error)
+
+    # the remainder is an upper bound, as each of the top N may be underestimated by up to summary.error
+    other = summary.total - top.sum()
+    if summary.counts.shape[0] > n or summary.error > 0 or not np.isclose(other, 0):
+        other_row = {**{col: other_val for col in cat_cols}, sort_by: other, 'upper_': other}
+        other_row['lower_'] = max(other - summary.error * top.shape[0], 0)
+        df = pd.concat([df, pd.DataFrame([other_row])], ignore_index=True)
+
+    return df.sort_values(by=sort_by, ascending=False, kind='mergesort').reset_index(drop=True)
+
+
 if __name__ == '__main__':
     pass  # pragma: no cover
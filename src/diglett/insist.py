@@ -3,13 +3,17 @@
 - These functions each verify a specific assumption.
 - They are "non-breaking" by using HTML warnings instead of actual assertions.
 - They each return the input object, allowing them to be used in DataFrame.pipe() chains.
+- A CheckSuite evaluates many checks together, on a DataFrame or on chunks of one which do not fit in memory.
 """
 
-from typing import Any, Iterable, List, Union
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
 
-from IPython.core.display import display, HTML
+import numpy as np
 import pandas as pd
 
+from .output import display, HTML
+from .sketch import HyperLogLog
+
 
 def _html_alert_danger(msg: str) -> HTML:
     """Display a message as a Bootstrap-styled HTML alert in a Jupyter notebook."""
@@ -23,27 +27,301 @@ def _html_alert_success(msg: str) -> HTML:
     return HTML(html_str)
 
 
-def less_than_pct_null(
-    df: pd.DataFrame,
-    cols: Iterable[str] = None,
-    pct: float = 0.01,
-    return_alert: bool = False,
-) -> Union[pd.DataFrame, HTML]:
-    """Check that specified (or all) columns contain less than some % of null values."""
-    if cols is None:
-        sub_df = df
-        cols = df.columns.tolist()
-    else:
-        sub_df = df[cols]
+def _alert(passed: bool, message: str) -> HTML:
+    """Turn the outcome of a check into a success or danger alert."""
+    return _html_alert_success(message) if passed else _html_alert_danger(message)
 
-    cols_with_nulls = sub_df.isnull().any().loc[lambda x: x == True].index.tolist()
 
-    if len(cols_with_nulls) / df.shape[0] > pct:
-        alert = _html_alert_danger(
-            f'More than {pct:.0%} null values in cols: {", ".join(cols_with_nulls)}'
-        )
-    else:
-        alert = _html_alert_success(f'Less than {pct:.0%} null values in cols: {", ".join(cols)}')
+def _column_stats(srs: pd.Series, stats: Set[str]) -> Dict[str, Any]:
+    """Compute the requested statistics of a column, sharing the work between them where possible."""
+
+    output: Dict[str, Any] = {'n_rows': srs.shape[0]}
+    if 'n_unique' in stats:
+        # a single hashing pass finds both the nulls and the unique values
+        codes, uniques = pd.factorize(srs)
+        output['n_null'] = int((codes == -1).sum())
+        output['n_unique'] = uniques.shape[0]
+    elif 'n_null' in stats:
+        output['n_null'] = int(srs.isnull().sum())
+
+    for stat in ('mean', 'min', 'max'):
+        if stat in stats:
+            output[stat] = getattr(srs, stat)()
+    return output
+
+
+def _fmin(a: Any, b: Any) -> Any:
+    """Return the smaller of two values, ignoring nulls, like Series.min()."""
+    return b if pd.isnull(a) else a if pd.isnull(b) else min(a, b)
+
+
+def _fmax(a: Any, b: Any) -> Any:
+    """Return the larger of two values, ignoring nulls, like Series.max()."""
+    return b if pd.isnull(a) else a if pd.isnull(b) else max(a, b)
+
+
+class PartialStats:
+    """Statistics of a chunk of rows, which merge with those of other chunks into statistics of all of their rows.
+
+    Merging is associative, so chunks can be summarized by different workers and combined in any order. Counts,
+    min/max and exact unique counts come out the same as those of the whole DataFrame, and the mean up to rounding,
+    so that checks pass or fail just as they would in memory. Exact unique counts keep the unique values of each
+    column until the end; distinct='hll' estimates them from a HyperLogLog sketch of fixed size instead.
+
+    Args:
+        needs: The statistics needed for each column, as returned by CheckSuite.required_stats().
+        distinct: How to count unique values, either 'exact' or 'hll'.
+
+    """
+
+    def __init__(self, needs: Dict[str, Set[str]], distinct: str = 'exact') -> None:
+        """Initialize statistics of zero rows."""
+        if distinct not in ('exact', 'hll'):
+            raise ValueError('Expecting distinct to be one of: exact, hll')
+        self.needs = needs
+        self.distinct = distinct
+        self.n_rows = 0
+        self.partials: Dict[str, Dict[str, Any]] = {
+            col: {'n_null': 0, 'sum': 0, 'count': 0, 'min': np.nan, 'max': np.nan, 'uniques': None} for col in needs
+        }
+
+    def update(self, chunk: pd.DataFrame) -> 'PartialStats':
+        """Add the statistics of a chunk of rows."""
+
+        self.n_rows += chunk.shape[0]
+        for col, stats in self.needs.items():
+            srs, partial = chunk[col], self.partials[col]
+            if 'n_unique' in stats and self.distinct == 'exact':
+                codes, uniques = pd.factorize(srs)
+                partial['n_null'] += int((codes == -1).sum())
+                partial['uniques'] = self._union(partial['uniques'], np.asarray(uniques))
+            elif 'n_unique' in stats:
+                partial['n_null'] += int(srs.isnull().sum())
+                partial['uniques'] = self._union(partial['uniques'], HyperLogLog().update(srs))
+            elif 'n_null' in stats:
+                partial['n_null'] += int(srs.isnull().sum())
+
+            if 'mean' in stats:
+                partial['sum'] += srs.sum()
+                partial['count'] += int(srs.count())
+            if 'min' in stats:
+                partial['min'] = _fmin(partial['min'], srs.min())
+            if 'max' in stats:
+                partial['max'] = _fmax(partial['max'], srs.max())
+        return self
+
+    def merge(self, other: 'PartialStats') -> 'PartialStats':
+        """Merge the statistics of other rows into these, e.g. those summarized by a different worker."""
+
+        if other.needs != self.needs or other.distinct != self.distinct:
+            raise ValueError('Expecting statistics of the same checks')
+
+        self.n_rows += other.n_rows
+        for col, partial in self.partials.items():
+            theirs = other.partials[col]
+            for key in ('n_null', 'sum', 'count'):
+                partial[key] += theirs[key]
+            partial['min'] = _fmin(partial['min'], theirs['min'])
+            partial['max'] = _fmax(partial['max'], theirs['max'])
+            partial['uniques'] = self._union(partial['uniques'], theirs['uniques'])
+        return self
+
+    def statistics(self) -> pd.DataFrame:
+        """Return the statistics of all of the rows, in the same format as those of CheckSuite."""
+
+        rows = {}
+        for col, stats in self.needs.items():
+            partial = self.partials[col]
+            row: Dict[str, Any] = {'n_rows': self.n_rows}
+            if stats & {'n_null', 'n_unique'}:
+                row['n_null'] = partial['n_null']
+            if 'n_unique' in stats:
+                uniques = partial['uniques']
+                if isinstance(uniques, HyperLogLog):
+                    row['n_unique'] = int(round(uniques.estimate()))
+                else:
+                    row['n_unique'] = 0 if uniques is None else uniques.shape[0]
+            if 'mean' in stats:
+                row['mean'] = partial['sum'] / partial['count'] if partial['count'] else np.nan
+            for stat in ('min', 'max'):
+                if stat in stats:
+                    row[stat] = partial[stat]
+            rows[col] = row
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    @staticmethod
+    def _union(a: Any, b: Any) -> Any:
+        """Combine two sets of unique values, or two HyperLogLog sketches, either of which may be None."""
+        if a is None or b is None:
+            return b if a is None else a
+        if isinstance(a, HyperLogLog):
+            return a.merge(b)
+        return pd.unique(np.concatenate([a, b]))
+
+
+def _eval_less_than_pct_null(stats: pd.DataFrame, cols: List[str], pct: float) -> Tuple[bool, float, str]:
+    """Evaluate less_than_pct_null() and no_nulls()."""
+    # n.b. the number of columns with nulls is compared to the number of rows, as it always has been
+    n_null = stats.loc[cols, 'n_null']
+    cols_with_nulls = n_null.index[n_null > 0].tolist()
+    value = len(cols_with_nulls) / stats['n_rows'].iloc[0]
+    if value > pct:
+        return False, value, f'More than {pct:.0%} null values in cols: {", ".join(cols_with_nulls)}'
+    return True, value, f'Less than {pct:.0%} null values in cols: {", ".join(cols)}'
+
+
+def _eval_more_than_pct_unique(stats: pd.DataFrame, cols: List[str], pct: float) -> Tuple[bool, float, str]:
+    """Evaluate more_than_pct_unique()."""
+    col = cols[0]
+    n_rows = stats.at[col, 'n_rows']
+    pct_unique = stats.at[col, 'n_unique'] / n_rows if n_rows else np.nan
+    msg = f'Cardinality: {pct_unique:.2%} of values in {col} are unique. Threshold set is {pct:.2%}.'
+    return pct_unique >= pct, pct_unique, msg
+
+
+def _eval_average_greater_than(stats: pd.DataFrame, cols: List[str], threshold: float) -> Tuple[bool, float, str]:
+    """Evaluate average_greater_than()."""
+    col = cols[0]
+    avg = stats.at[col, 'mean']
+    return not avg < threshold, avg, f'Avg value of {col} is {avg:.2%}. Threshold is {threshold:.2%}.'
+
+
+def _eval_values_between(stats: pd.DataFrame, cols: List[str], threshold: Tuple) -> Tuple[bool, Tuple, str]:
+    """Evaluate values_between()."""
+    col, (lower, upper) = cols[0], threshold
+    value = (stats.at[col, 'min'], stats.at[col, 'max'])
+    msg = f'Values of {col} range from {value[0]} to {value[1]}. Bounds are {lower} and {upper}.'
+    return bool(lower <= value[0] and value[1] <= upper), value, msg
+
+
+# the statistics which each check needs, and how it is evaluated from them
+RULES: Dict[str, Tuple[Set[str], Callable]] = {
+    'less_than_pct_null': ({'n_null'}, _eval_less_than_pct_null),
+    'no_nulls': ({'n_null'}, _eval_less_than_pct_null),
+    'more_than_pct_unique': ({'n_unique'}, _eval_more_than_pct_unique),
+    'average_greater_than': ({'mean'}, _eval_average_greater_than),
+    'values_between': ({'min', 'max'}, _eval_values_between),
+}
+
+REPORT_COLS = ['check', 'cols', 'passed', 'value', 'threshold', 'message']
+
+
+class CheckSuite:
+    """A set of checks which are registered up front, and then evaluated together on a DataFrame.
+
+    Each column is scanned once for all of the statistics which the checks need (null count, number of unique
+    values, mean, min/max), however many checks share them, and every check is then evaluated from those:
+
+    >>> suite = CheckSuite().no_nulls(['id']).more_than_pct_unique('id').average_greater_than('pct_', 0.5)
+    >>> report = suite.run(df)
+    >>> df = df.pipe(suite)  # displays an alert per check
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty suite."""
+        self.checks: List[Tuple[str, Optional[List[str]], Any]] = []
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Display an alert per check, so that the suite can itself be used in DataFrame.pipe()."""
+        for _, row in self.run(df).iterrows():
+            display(_alert(row['passed'], row['message']))
+        return df
+
+    def _add(self, check: str, cols: Optional[Iterable[str]], threshold: Any) -> 'CheckSuite':
+        """Register a check of some columns (None for all columns) against a threshold."""
+        self.checks.append((check, None if cols is None else list(cols), threshold))
+        return self
+
+    def less_than_pct_null(self, cols: Optional[Iterable[str]] = None, pct: float = 0.01) -> 'CheckSuite':
+        """Check that specified (or all) columns contain less than some % of null values."""
+        return self._add('less_than_pct_null', cols, pct)
+
+    def no_nulls(self, cols: Optional[List[str]] = None) -> 'CheckSuite':
+        """Check that specified (or all) columns do not contain null values."""
+        return self._add('no_nulls', cols, 0)
+
+    def more_than_pct_unique(self, col: str, pct: Union[int, float] = 0.99) -> 'CheckSuite':
+        """Check that a minimum pct. of values in a column are unique."""
+        return self._add('more_than_pct_unique', [col], pct)
+
+    def average_greater_than(self, col: str, threshold: Union[int, float]) -> 'CheckSuite':
+        """Check that average of specified column is greater than some value."""
+        return self._add('average_greater_than', [col], threshold)
+
+    def values_between(self, col: str, lower: Any, upper: Any) -> 'CheckSuite':
+        """Check that all values of specified column lie between some bounds (inclusive)."""
+        return self._add('values_between', [col], (lower, upper))
+
+    def required_stats(self, columns: Iterable[str]) -> Dict[str, Set[str]]:
+        """Map each column which is checked to the statistics the checks need, in the order of columns."""
+        needs: Dict[str, Set[str]] = {col: set() for col in columns}
+        for check, cols, _ in self.checks:
+            for col in needs if cols is None else cols:
+                if col not in needs:
+                    raise KeyError(col)
+                needs[col] |= RULES[check][0]
+        return {col: stats for col, stats in needs.items() if stats}
+
+    def statistics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Compute the statistics needed by the checks, with one row per column."""
+        needs = self.required_stats(df.columns)
+        rows = {col: _column_stats(df[col], stats) for col, stats in needs.items() if stats != {'n_null'}}
+        output = pd.DataFrame.from_dict(rows, orient='index')
+
+        # columns which only need their null count are counted together, in a single vectorized pass (over df
+        # itself if that is every column, since selecting columns copies them)
+        null_only = [col for col, stats in needs.items() if stats == {'n_null'}]
+        if null_only:
+            null_df = df if len(null_only) == df.shape[1] else df[null_only]
+            counts = pd.DataFrame({'n_rows': df.shape[0], 'n_null': null_df.isnull().sum()})
+            output = pd.concat([output, counts]) if rows else counts
+        return output.reindex(list(needs))
+
+    def evaluate(self, stats: pd.DataFrame) -> pd.DataFrame:
+        """Evaluate every check from the output of statistics(), as a report with one row per check."""
+        rows = []
+        for check, cols, threshold in self.checks:
+            cols = stats.index.tolist() if cols is None else cols
+            passed, value, message = RULES[check][1](stats, cols, threshold)
+            rows.append([check, cols, passed, value, threshold, message])
+        return pd.DataFrame(rows, columns=REPORT_COLS)
+
+    def partial(self, chunk: pd.DataFrame, distinct: str = 'exact') -> PartialStats:
+        """Compute the partial statistics of a chunk of rows, to be merged with those of other chunks.
+
+        This lets chunks be summarized in parallel, e.g.:
+
+        >>> partials = pool.map(suite.partial, chunks)
+        >>> report = suite.evaluate(functools.reduce(PartialStats.merge, partials).statistics())
+
+        """
+        return PartialStats(self.required_stats(chunk.columns), distinct).update(chunk)
+
+    def run(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]], distinct: str = 'exact') -> pd.DataFrame:
+        """Compute statistics from a single pass over each column, and evaluate every check.
+
+        Args:
+            data: A DataFrame, or an iterable of DataFrames with the same columns, e.g. from read_csv(chunksize=…).
+            distinct: How to count the unique values of chunks, either 'exact' or 'hll' (see PartialStats).
+
+        """
+
+        if isinstance(data, pd.DataFrame):
+            return self.evaluate(self.statistics(data))
+
+        partial = None
+        for chunk in data:
+            partial = self.partial(chunk, distinct) if partial is None else partial.update(chunk)
+        if partial is None:
+            raise ValueError('Expecting at least one chunk')
+        return self.evaluate(partial.statistics())
+
+
+def _check(df: pd.DataFrame, suite: CheckSuite, return_alert: bool) -> Union[pd.DataFrame, HTML]:
+    """Run a suite of a single check, and either return its alert or display it and return the input."""
+    report = suite.run(df)
+    alert = _alert(report.at[0, 'passed'], report.at[0, 'message'])
 
     if return_alert:
         return alert
@@ -52,31 +330,99 @@ def less_than_pct_null(
         return df
 
 
-def no_nulls(df: pd.DataFrame, cols: List[str] = None, **kwargs: Any) -> Union[pd.DataFrame, HTML]:
+def less_than_pct_null(
+    df: pd.DataFrame,
+    cols: Optional[Iterable[str]] = None,
+    pct: float = 0.01,
+    return_alert: bool = False,
+) -> Union[pd.DataFrame, HTML]:
+    """Check that specified (or all) columns contain less than some % of null values."""
+    return _check(df, CheckSuite().less_than_pct_null(cols, pct), return_alert)
+
+
+def no_nulls(df: pd.DataFrame, cols: Optional[List[str]] = None, **kwargs: Any) -> Union[pd.DataFrame, HTML]:
     """Check that specified (or all) columns do not contain null values."""
 
     return less_than_pct_null(df, cols, pct=0, **kwargs)
 
 
+class UniqueScan(NamedTuple):
+    """The outcome of scan_unique(): unique values found, among how many rows scanned, out of how many in total."""
+
+    n_unique: int
+    n_scanned: int
+    n_rows: int
+
+    @property
+    def bounds(self) -> Tuple[float, float]:
+        """The lowest and highest possible pct. of unique values, given the rows which are not scanned yet, or NaN."""
+        if not self.n_rows:
+            return np.nan, np.nan
+        return self.n_unique / self.n_rows, (self.n_unique + self.n_rows - self.n_scanned) / self.n_rows
+
+
+def scan_unique(srs: pd.Series, pct: float, block_size: int = 100_000) -> UniqueScan:
+    """Count unique values in blocks of a Series, until the pct. of unique values is certainly above or below pct.
+
+    The hashes of values seen so far are kept, and each block is twice the size of the previous one. The scan stops
+    as soon as enough unique values are found, or too few rows are left to find enough, e.g. after a small
+    fraction of a heavily duplicated key. Values are compared by their 64-bit hashes.
+
+    Args:
+        srs: The Series to scan.
+        pct: The threshold of the pct. of unique values.
+        block_size: The number of rows in the first block.
+
+    """
+
+    n_rows = srs.shape[0]
+    seen = np.empty(0, dtype='uint64')
+    n_scanned = 0
+    while n_scanned < n_rows:
+        block = srs.iloc[n_scanned:n_scanned + block_size]
+        block = block[block.notnull()]
+        if pd.api.types.is_float_dtype(block.dtype):
+            block = block + 0.0  # n.b. so that -0.0 and 0.0 are the same value
+        seen = np.union1d(seen, pd.util.hash_pandas_object(block, index=False).to_numpy())
+        n_scanned = min(n_scanned + block_size, n_rows)
+        block_size *= 2
+
+        scan = UniqueScan(seen.shape[0], n_scanned, n_rows)
+        lowest, highest = scan.bounds
+        if lowest >= pct or highest < pct:
+            return scan
+    return UniqueScan(seen.shape[0], n_scanned, n_rows)
+
+
 def more_than_pct_unique(
     df: pd.DataFrame,
     col: str,
     pct: Union[int, float] = 0.99,
     return_alert: bool = False,
+    early_exit: bool = False,
+    block_size: int = 100_000,
 ) -> Union[pd.DataFrame, HTML]:
-    """Check that a minimum pct. of values in a Series are unique."""
+    """Check that a minimum pct. of values in a Series are unique.
 
-    srs = df[col]
-    pct_unique = srs.nunique() / srs.shape[0]
+    With early_exit, values are counted in blocks with scan_unique(), which stops as soon as the outcome is certain,
+    and the alert gives the bound on the pct. of unique values and the number of rows scanned.
+    """
 
-    if pct_unique >= pct:
-        alert = _html_alert_success(
-            f'Cardinality: {pct_unique:.2%} of values in {srs.name} are unique. Threshold set is {pct:.2%}.'
-        )
+    if not early_exit:
+        return _check(df, CheckSuite().more_than_pct_unique(col, pct), return_alert)
+
+    scan = scan_unique(df[col], pct, block_size=block_size)
+    lowest, highest = scan.bounds
+    passed = lowest >= pct
+    if scan.n_scanned == scan.n_rows:
+        value = f'{lowest:.2%}'
     else:
-        alert = _html_alert_danger(
-            f'Cardinality: {pct_unique:.2%} of values in {srs.name} are unique. Threshold set is {pct:.2%}.'
-        )
+        value = f'at least {lowest:.2%}' if passed else f'at most {highest:.2%}'
+    alert = _alert(
+        passed,
+        f'Cardinality: {value} of values in {col} are unique, from {scan.n_scanned:,} of {scan.n_rows:,} rows. '
+        f'Threshold set is {pct:.2%}.',
+    )
 
     if return_alert:
         return alert
@@ -92,20 +438,15 @@ def average_greater_than(
     return_alert: bool = False,
 ) -> Union[pd.DataFrame, HTML]:
     """Check that average of specified column is greater than some value."""
+    return _check(df, CheckSuite().average_greater_than(col, threshold), return_alert)
 
-    avg = df[col].mean()
-
-    if avg < threshold:
-        alert = _html_alert_danger(
-            f'Avg value of {col} is {avg:.2%}. Threshold is {threshold:.2%}.'
-        )
-    else:
-        alert = _html_alert_success(
-            f'Avg value of {col} is {avg:.2%}. Threshold is {threshold:.2%}.'
-        )
 
-    if return_alert:
-        return alert
-    else:
-        display(alert)
-        return df
+def values_between(
+    df: pd.DataFrame,
+    col: str,
+    lower: Any,
+    upper: Any,
+    return_alert: bool = False,
+) -> Union[pd.DataFrame, HTML]:
+    """Check that all values of specified column lie between some bounds (inclusive)."""
+    return _check(df, CheckSuite().values_between(col, lower, upper), return_alert)
@@ -1,69 +1,599 @@
 """ Functions related to joinging/merging datasets. """
 
-from IPython.core.display import display
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import tempfile
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type, Union
+import weakref
+
+import numpy as np
 import pandas as pd
 
+from .output import display
+
+
+Keys = Union[str, List[str]]
+
+INT64_MAX = np.iinfo('int64').max
+
+SPILL_FORMATS = ('parquet', 'feather', 'pickle')
+
+
+def _as_list(keys: Keys) -> List[str]:
+    """Return a key column name as a list of one name, and a list of names as is."""
+    return [keys] if isinstance(keys, str) else list(keys)
+
+
+def _key_columns(df: pd.DataFrame, on: Optional[Keys]) -> List[Union[pd.Series, pd.Index]]:
+    """Return the key columns of df: the given column(s), or the level(s) of its index if on is None."""
+    if on is None:
+        return [df.index.get_level_values(i) for i in range(df.index.nlevels)]
+    return [df[col] for col in _as_list(on)]
+
+
+def _factorize_column(values: Union[pd.Series, pd.Index]) -> Tuple[np.ndarray, pd.Index]:
+    """Factorize a key column, giving nulls their own code after the last unique value, since null keys match."""
+    codes, uniques = pd.factorize(values)
+    return np.where(codes == -1, uniques.shape[0], codes), pd.Index(uniques)
+
+
+def _combine_codes(codes: List[np.ndarray], sizes: List[int]) -> np.ndarray:
+    """Combine per-column codes into one compact int64 code per row, via mixed-radix (row-major) numbering.
+
+    Whenever the number of combinations would overflow int64, the partial codes are factorized first, so that
+    their radix is the number of combinations actually present rather than the product of all column sizes.
+    """
+
+    combined, size = codes[0].astype('int64'), sizes[0]
+    for col_codes, col_size in zip(codes[1:], sizes[1:]):
+        if size * col_size > INT64_MAX:
+            combined, uniques = pd.factorize(combined)
+            size = uniques.shape[0]
+        combined, size = combined * col_size + col_codes, size * col_size
+    return pd.factorize(combined)[0]
+
+
+class MergeIndex:
+    """The right-hand side of a merge, with its keys factorized once so that it can be merged against repeatedly.
+
+    Building the index hashes the right keys and computes their uniqueness and null stats once. Later merges
+    (via verbose_merge or merge_indexed) then only need to hash the keys of the left side.
+
+    Multi-column keys are factorized column by column, and the column codes combined into a single int64 code
+    per row, so that composite keys are never hashed row by row as tuples. As in pd.merge(), null keys match
+    each other, column by column.
+
+    Args:
+        df: The right-hand DataFrame, e.g. a dimension table.
+        on: The key column, or list of key columns. If None, the index (or MultiIndex) of df is used as the key.
+
+    """
+
+    def __init__(self, df: pd.DataFrame, on: Optional[Keys] = None) -> None:
+        """Factorize the keys of df, and compute their stats."""
+        self.df = df
+        self.on = on
+
+        columns = [_factorize_column(values) for values in _key_columns(df, on)]
+        self.codebooks = [uniques for _, uniques in columns]
+        self.n_nulls = int(np.logical_or.reduce([codes == uniques.shape[0] for codes, uniques in columns]).sum())
+
+        # the combined code of each distinct key, keyed by the combined codes of its column codes, which are
+        # looked up the same way for the left keys, and only hashed if the key has more than one column
+        self._stages: List[Optional[pd.Index]] = []
+        combined = self._combine([codes for codes, _ in columns], self._stages)
+        self.codes, uniques = pd.factorize(combined)
+        self.uniques = pd.Index(uniques)
+
+        self.counts = np.bincount(self.codes, minlength=self.uniques.shape[0])
+        self.is_unique = self.n_nulls == 0 and bool((self.counts <= 1).all())
+        self._rows: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def n_keys(self) -> int:
+        """The number of key columns."""
+        return len(self.codebooks)
+
+    def _combine(self, codes: List[np.ndarray], stages: Optional[List[Optional[pd.Index]]] = None) -> np.ndarray:
+        """Combine per-column codes into one int64 code per row, with -1 for rows with any column code of -1.
+
+        Building the index records, at each column, the partial codes it factorized to avoid int64 overflow (or
+        None). Encoding left keys then replays the same steps, looking up the recorded partial codes instead.
+        """
+
+        is_missing = codes[0] == -1
+        combined, size = codes[0].astype('int64'), self.codebooks[0].shape[0] + 1
+        for i, col_codes in enumerate(codes[1:]):
+            col_size = self.codebooks[i + 1].shape[0] + 1
+            if stages is not None:
+                stages.append(pd.Index(pd.unique(combined)) if size * col_size > INT64_MAX else None)
+            stage = self._stages[i]
+            if stage is not None:
+                combined, size = stage.get_indexer(combined), stage.shape[0]
+                is_missing |= combined == -1
+            is_missing |= col_codes == -1
+            combined, size = combined * col_size + col_codes, size * col_size
+        return np.where(is_missing, -1, combined)
+
+    def encode(self, keys: List[Union[pd.Series, pd.Index]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Look up the code of each row of key columns in this index, or -1 if not found, and whether it has nulls."""
+
+        if len(keys) != self.n_keys:
+            raise ValueError(f'Expecting {self.n_keys} key column(s), got {len(keys)}')
+
+        codes, is_null = [], np.zeros(len(keys[0]), dtype=bool)
+        for values, uniques in zip(keys, self.codebooks):
+            col_codes = uniques.get_indexer(values)
+            col_nulls = np.asarray(pd.isnull(values))
+            col_codes[col_nulls] = uniques.shape[0]
+            codes.append(col_codes)
+            is_null |= col_nulls
+
+        combined = self._combine(codes)
+        found = combined != -1
+        output = np.full(combined.shape[0], -1)
+        output[found] = self.uniques.get_indexer(combined[found])
+        return output, is_null
+
+    def rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the row positions of df sorted by code, and the offset at which each code starts."""
+        if self._rows is None:
+            order = np.argsort(self.codes, kind='stable')
+            starts = np.cumsum(self.counts) - self.counts
+            self._rows = (order, starts)
+        return self._rows
+
+
+class MergeStats(NamedTuple):
+    """Cardinality diagnostics of a merge, computed from the keys alone."""
+
+    left_unique: bool
+    right_unique: bool
+    left_max: int
+    right_max: int
+    left_nulls: int
+    right_nulls: int
+    left_only: int
+    both: int
+    right_only: int
+
+
+def _merge_stats(left_keys: List[Union[pd.Series, pd.Index]], index: MergeIndex) -> MergeStats:
+    """Compute merge diagnostics from the left keys and a MergeIndex of the right keys, hashing only the left keys.
+
+    Each key present on both sides yields (left count × right count) rows, so many-to-many keys are counted as
+    they would be in the merge output. Like pd.merge(), null keys match each other.
+    """
+
+    codes, is_null = index.encode(left_keys)
+    is_matched = codes >= 0
+
+    # left counts per right key, plus counts of the left keys which have no match
+    left_counts = np.bincount(codes[is_matched], minlength=index.uniques.shape[0])
+    unmatched = [_factorize_column(np.asarray(values)[~is_matched]) for values in left_keys]
+    unmatched_codes = _combine_codes(
+        [codes for codes, _ in unmatched], [uniques.shape[0] + 1 for _, uniques in unmatched]
+    )
+    left_max = max(left_counts.max(initial=0), np.bincount(unmatched_codes).max(initial=0))
+    left_nulls = int(is_null.sum())
+
+    return MergeStats(
+        left_unique=left_nulls == 0 and left_max <= 1,
+        right_unique=index.is_unique,
+        left_max=int(left_max),
+        right_max=int(index.counts.max(initial=0)),
+        left_nulls=left_nulls,
+        right_nulls=index.n_nulls,
+        left_only=int((~is_matched).sum()),
+        both=int((left_counts * index.counts).sum()),
+        right_only=int(index.counts[left_counts == 0].sum()),
+    )
+
+
+def _print_stats(stats: MergeStats) -> None:
+    """Print cardinality, multiplicity and null diagnostics, and display a table of match counts."""
+
+    # print cardinality diagnostics
+    is_unique_left = '✅' if stats.left_unique else '❌'
+    is_unique_right = '✅' if stats.right_unique else '❌'
+    print(f'Unique keys: ({is_unique_left}, {is_unique_right})')
+
+    # print multiplicity diagnostics, i.e. how many rows a single key fans out into
+    print(f'Max rows per key: ({stats.left_max}, {stats.right_max})')
+
+    # print null diagnostics
+    print(f'Nulls: ({stats.left_nulls}, {stats.right_nulls})')
+
+    display(
+        pd.Series({'left_only': stats.left_only, 'both': stats.both, 'right_only': stats.right_only})
+        .rename('Total')
+        .to_frame()
+        .assign(Pct=lambda x: x['Total'] / x['Total'].sum())
+        .style.format({'Pct': '{:.2%}'})
+    )
+
+
+def _output_size(stats: MergeStats, how: str, left: pd.DataFrame, right: pd.DataFrame) -> Tuple[int, int]:
+    """Compute the exact number of rows of a merge, and estimate its size in bytes, before running it.
+
+    The estimate assumes each output row is as wide as one left row plus one right row (shallow memory usage),
+    since merging copies references to Python objects such as strings, rather than the objects themselves.
+    """
+
+    row_counts = {
+        'inner': stats.both,
+        'left': stats.both + stats.left_only,
+        'right': stats.both + stats.right_only,
+        'outer': stats.left_only + stats.both + stats.right_only,
+    }
+    if how not in row_counts:
+        raise ValueError(f'Unsupported merge type: {how}')
+    n_rows = int(row_counts[how])
+
+    row_bytes = sum(
+        df.memory_usage(index=True, deep=False).sum() / df.shape[0] for df in (left, right) if df.shape[0]
+    )
+    return n_rows, int(n_rows * row_bytes)
+
+
+def merge_indexed(
+    left: pd.DataFrame,
+    index: MergeIndex,
+    left_on: Optional[Keys] = None,
+    how: str = 'left',
+    suffixes: Tuple[str, str] = ('_x', '_y'),
+) -> pd.DataFrame:
+    """Merge a DataFrame with a MergeIndex, hashing only the left keys.
+
+    Equivalent to pd.merge(left, index.df, how=how, ...) for how='left' or how='inner', including the order of
+    rows: that of left for how='left', while how='inner' groups the rows of each key together, in the order in
+    which keys first appear in left. Join on left_on if the index was built on a column, else on the left index.
+
+    Args:
+        left: The left-hand DataFrame.
+        index: A MergeIndex of the right-hand DataFrame.
+        left_on: The left key column (or list of columns, matching those of the index), or None to join on the
+            left index.
+        how: Either 'left' or 'inner'.
+        suffixes: Suffixes for overlapping (non-key) column names, as in pd.merge().
+
+    """
+
+    if how not in ('left', 'inner'):
+        raise ValueError('Expecting how to be one of: left, inner')
+    if (left_on is None) != (index.on is None):
+        raise ValueError('Expecting either left_on with an index built on a column, or neither')
+
+    right = index.df
+    codes, _ = index.encode(_key_columns(left, left_on))
+    positions = np.arange(left.shape[0])
+    if how == 'inner':
+        positions = np.argsort(pd.factorize(codes)[0], kind='stable')
+        codes = codes[positions]
+    n_matches = np.zeros(codes.shape[0], dtype='int64')
+    n_matches[codes >= 0] = index.counts[codes[codes >= 0]]
+
+    # every left row is repeated once per matching right row (or once with no match, for how='left')
+    n_out = np.maximum(n_matches, 1) if how == 'left' else n_matches
+    left_take = np.repeat(positions, n_out)
+    ramp = np.arange(left_take.shape[0]) - np.repeat(np.cumsum(n_out) - n_out, n_out)
+    order, starts = index.rows()
+    is_matched = np.repeat(n_matches, n_out) > 0
+    right_take = np.full(left_take.shape[0], -1)
+    # unmatched rows (code -1) look up the dummy start appended at the end, and are then masked out
+    right_starts = np.append(starts, 0)[codes]
+    right_take[is_matched] = order[(np.repeat(right_starts, n_out) + ramp)[is_matched]]
+
+    # as in pd.merge(), a key column with the same name on both sides appears only once
+    shared_keys = set()
+    if left_on is not None and index.on is not None:
+        shared_keys = {l for l, r in zip(_as_list(left_on), _as_list(index.on)) if l == r}
+    right_cols = [col for col in right.columns if col not in shared_keys]
+    overlap = set(left.columns) & set(right_cols)
+    left_part = left.take(left_take).rename(columns={col: f'{col}{suffixes[0]}' for col in overlap})
+    right_part = (
+        right[right_cols]
+        .reset_index(drop=True)
+        .reindex(right_take)
+        .rename(columns={col: f'{col}{suffixes[1]}' for col in overlap})
+    )
+    right_part.index = left_part.index
+
+    output = pd.concat([left_part, right_part], axis=1)
+    if left_on is not None:
+        output = output.reset_index(drop=True)
+    return output
+
+
 # flake8: noqa: DAR101,DAR201,DAR401
 def verbose_merge(
     left: pd.DataFrame,
-    right: pd.DataFrame,
-    left_on: str = None,
-    right_on: str = None,
+    right: Union[pd.DataFrame, MergeIndex],
+    left_on: Keys = None,
+    right_on: Keys = None,
     left_index: bool = False,
     right_index: bool = False,
-    *args,
-    **kwargs,
+    *args: Any,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    **kwargs: Any,
 ) -> pd.DataFrame:
     """Wraps pd.merge function to provide a visual overview of cardinality between datasets.
 
-    Specify both (left_on, right_on) or (left_index, right_index) arguments.
+    Specify both (left_on, right_on) or (left_index, right_index) arguments. Keys can be single columns or
+    lists of columns, which are factorized column by column into a single int64 code per row on both sides.
+
+    The right side can also be a MergeIndex, which caches the hashed right keys across repeated merges
+    against the same table. Its key is then used in place of right_on or right_index.
+
+    The size of the output is computed from the key counts before merging, so that a join explosion
+    (e.g. from an unexpected many-to-many key) raises a ValueError if it exceeds max_rows or max_bytes,
+    instead of allocating the output.
+
+    For inputs which don't fit in memory, see partitioned_merge().
 
     """
 
-    if left_on and right_on:
-        left_vals = left[left_on]
-        right_vals = right[right_on]
+    is_cached = isinstance(right, MergeIndex)
+    right_keys: Optional[Keys] = right_on
+    if is_cached:
+        index = right
+        right = index.df
+        right_keys = index.on
+        right_index = index.on is None
+
+    if left_on and right_keys:
+        left_keys = _key_columns(left, left_on)
     elif left_index and right_index:
-        left_vals = left.index
-        right_vals = right.index
+        left_keys = _key_columns(left, None)
     else:
         raise ValueError('Function must take parameters: left_on+right_on or left_index+right_index.')
 
-    # print cardinality diagnostics
-    is_unique_left = '❌'
-    is_unique_right = '❌'
-    if left_vals.nunique() == left_vals.shape[0]:
-        is_unique_left = '✅'
-    if right_vals.nunique() == right_vals.shape[0]:
-        is_unique_right = '✅'
-    print(f'Unique keys: ({is_unique_left}, {is_unique_right})')
+    if not is_cached:
+        index = MergeIndex(right, on=right_keys or None)
+    stats = _merge_stats(left_keys, index)
 
-    # print null diagnostics
-    left_nulls = left_vals.isnull().sum()
-    right_nulls = right_vals.isnull().sum()
-    print(f'Nulls: ({left_nulls}, {right_nulls})')
+    _print_stats(stats)
+
+    # pre-flight check of output size, using the same argument resolution as pd.merge()
+    how = args[0] if args else kwargs.get('how', 'inner')
+    n_rows, n_bytes = _output_size(stats, how, left, right)
+    print(f'Output rows: {n_rows:,} (~{n_bytes / 10 ** 9:.2f} GB)')
+
+    if max_rows is not None and n_rows > max_rows:
+        raise ValueError(f'Merge would produce {n_rows:,} rows, more than max_rows={max_rows:,}')
+    if max_bytes is not None and n_bytes > max_bytes:
+        raise ValueError(f'Merge would use ~{n_bytes:,} bytes, more than max_bytes={max_bytes:,}')
 
-    diag = pd.merge(
+    # reuse the cached right keys, unless pd.merge() options are needed which merge_indexed() doesn't support
+    if is_cached and not args and how in ('left', 'inner') and set(kwargs) <= {'how', 'suffixes'}:
+        suffixes = kwargs.get('suffixes', ('_x', '_y'))
+        return merge_indexed(left, index, left_on=left_on or None, how=how, suffixes=suffixes)
+
+    return pd.merge(
         left,
         right,
+        *args,
         left_on=left_on,
-        right_on=right_on,
+        right_on=right_keys,
         left_index=left_index,
         right_index=right_index,
-        how='outer',
-        indicator=True,
+        **kwargs,
     )
 
-    display(
-        diag['_merge']
-        .value_counts()
-        .reindex(['left_only', 'both', 'right_only'])
-        .rename('Total')
-        .to_frame()
-        .assign(Pct=lambda x: x['Total'] / x['Total'].sum())
-        .style.format({'Pct': '{:.2%}'})
-    )
 
-    return pd.merge(
-        left, right, left_on=left_on, right_on=right_on, left_index=left_index, right_index=right_index, *args, **kwargs
+def _write_spill(df: pd.DataFrame, path: str, file_format: str) -> None:
+    """Write a DataFrame (without its index) to a spill file."""
+    if file_format == 'parquet':
+        df.to_parquet(path, index=False)
+    elif file_format == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.reset_index(drop=True).to_pickle(path)
+
+
+def _read_spill(path: str, file_format: str) -> pd.DataFrame:
+    """Read a DataFrame from a spill file."""
+    if file_format == 'parquet':
+        return pd.read_parquet(path)
+    if file_format == 'feather':
+        return pd.read_feather(path)
+    return pd.read_pickle(path)
+
+
+def _partition_ids(df: pd.DataFrame, on: Keys, n_partitions: int) -> np.ndarray:
+    """Assign each row to a partition by hashing its key, so that equal keys on both sides share a partition."""
+    keys = pd.DataFrame({i: _partition_key(values) for i, values in enumerate(_key_columns(df, on))})
+    # None and NaN hash differently, but match each other in a merge
+    keys = keys.apply(lambda col: col.where(col.notna(), None) if col.dtype == 'object' else col)
+    return (pd.util.hash_pandas_object(keys, index=False).to_numpy() % n_partitions).astype('int64')
+
+
+def _partition_key(values: Union[pd.Series, pd.Index]) -> np.ndarray:
+    """Convert a key column to the values to hash, so that keys which match in a merge also hash the same."""
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        # e.g. the integer 1 and the float 1.0 (or 0.0 and -0.0) match, so hash every number as a float
+        return values.astype('float64').to_numpy() + 0.0
+    return values.to_numpy()
+
+
+def _spill(
+    chunks: Iterable[pd.DataFrame], on: Keys, n_partitions: int, directory: str, file_format: str
+) -> Tuple[List[List[str]], pd.DataFrame]:
+    """Split each chunk into partitions by key, and write them to disk.
+
+    Returns the spill files of each partition, and an empty frame with the schema of the chunks.
+    """
+
+    paths: List[List[str]] = [[] for _ in range(n_partitions)]
+    schema = None
+    for i, chunk in enumerate(chunks):
+        if schema is None:
+            schema = chunk.iloc[:0]
+        for partition, part in chunk.groupby(_partition_ids(chunk, on, n_partitions), sort=False):
+            path = os.path.join(directory, f'{partition}-{i}.{file_format}')
+            _write_spill(part, path, file_format)
+            paths[partition].append(path)
+
+    if schema is None:
+        raise ValueError('Expecting at least one chunk on each side of the merge')
+    return paths, schema
+
+
+def _merge_partition(
+    left_paths: List[str],
+    right_paths: List[str],
+    left_schema: pd.DataFrame,
+    right_schema: pd.DataFrame,
+    left_on: Keys,
+    right_on: Keys,
+    how: str,
+    suffixes: Tuple[str, str],
+    file_format: str,
+    out_path: str,
+) -> Tuple[MergeStats, int]:
+    """Merge the spill files of a single partition, write the output, and return its diagnostics and row count."""
+
+    left, right = [
+        pd.concat([_read_spill(path, file_format) for path in paths], ignore_index=True) if paths else schema
+        for paths, schema in ((left_paths, left_schema), (right_paths, right_schema))
+    ]
+    stats = _merge_stats(_key_columns(left, left_on), MergeIndex(right, on=right_on))
+    output = pd.merge(left, right, left_on=left_on, right_on=right_on, how=how, suffixes=suffixes)
+    _write_spill(output, out_path, file_format)
+    return stats, output.shape[0]
+
+
+def _combine_stats(stats: List[MergeStats]) -> MergeStats:
+    """Combine the diagnostics of partitions. They are exact, since every key falls within a single partition."""
+    return MergeStats(
+        left_unique=all(s.left_unique for s in stats),
+        right_unique=all(s.right_unique for s in stats),
+        left_max=max(s.left_max for s in stats),
+        right_max=max(s.right_max for s in stats),
+        left_nulls=sum(s.left_nulls for s in stats),
+        right_nulls=sum(s.right_nulls for s in stats),
+        left_only=sum(s.left_only for s in stats),
+        both=sum(s.both for s in stats),
+        right_only=sum(s.right_only for s in stats),
     )
+
+
+class PartitionedOutput(Iterator[pd.DataFrame]):
+    """An iterator over the output partitions of partitioned_merge(), which are read from disk one at a time.
+
+    The temporary spill directory is deleted once every partition has been read, when close() is called (e.g. by
+    using it as a context manager), or at the latest when the iterator is garbage-collected.
+    """
+
+    def __init__(self, paths: List[str], file_format: str, cleanup_dir: str) -> None:
+        """Iterate over the spill files at paths, and delete cleanup_dir once done (or garbage-collected)."""
+        self._paths = list(paths)
+        self._file_format = file_format
+        self._cleanup = weakref.finalize(self, shutil.rmtree, cleanup_dir, ignore_errors=True)
+
+    def __next__(self) -> pd.DataFrame:
+        """Read the next output partition, or delete the spill directory once every partition has been read."""
+        if not self._paths:
+            self.close()
+            raise StopIteration
+        return _read_spill(self._paths.pop(0), self._file_format)
+
+    def close(self) -> None:
+        """Delete the spill directory, skipping any partitions not yet read."""
+        self._paths = []
+        self._cleanup()
+
+    def __enter__(self) -> 'PartitionedOutput':
+        """Return this iterator, so that close() is called on exiting the with block."""
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc: Optional[BaseException], tb: Any) -> None:
+        """Delete the spill directory, even if an exception was raised."""
+        self.close()
+
+
+def partitioned_merge(
+    left_chunks: Iterable[pd.DataFrame],
+    right_chunks: Iterable[pd.DataFrame],
+    left_on: Keys,
+    right_on: Keys,
+    how: str = 'inner',
+    n_partitions: int = 16,
+    processes: Optional[int] = None,
+    spill_dir: Optional[str] = None,
+    out_dir: Optional[str] = None,
+    file_format: str = 'parquet',
+    suffixes: Tuple[str, str] = ('_x', '_y'),
+) -> Union[PartitionedOutput, List[str]]:
+    """Merge two tables which are too large to fit in memory, with the same diagnostics as verbose_merge().
+
+    Both sides are read one chunk at a time, and hash-partitioned by key into spill files on disk. Each pair of
+    partitions then fits in memory, and is merged separately, optionally in a pool of processes. Since every key
+    falls within a single partition, diagnostics aggregated across partitions are exact.
+
+    Rows are grouped by partition, so the output is not in the order of either input.
+
+    Args:
+        left_chunks: An iterable of DataFrames with the same columns, e.g. from pd.read_csv(chunksize=…).
+        right_chunks: An iterable of DataFrames with the same columns.
+        left_on: The left key column, or list of columns.
+        right_on: The right key column, or list of columns.
+        how: One of 'inner', 'left', 'right' or 'outer'.
+        n_partitions: The number of partitions. Increase it until each pair of partitions fits in memory.
+        processes: The number of processes with which to merge partitions. If None, merge them one at a time.
+        spill_dir: The directory in which to create a temporary directory of spill files. Defaults to the
+            system temporary directory.
+        out_dir: If given, write the output partitions to this directory, and return their paths.
+        file_format: The format of spill and output files: 'parquet' or 'feather' (both require pyarrow),
+            or 'pickle'.
+        suffixes: Suffixes for overlapping (non-key) column names, as in pd.merge().
+
+    Returns:
+        A PartitionedOutput iterator of output chunks (one per non-empty partition), or the paths of output files
+        if out_dir is given.
+
+    """
+
+    if file_format not in SPILL_FORMATS:
+        raise ValueError(f'Expecting file_format to be one of: {", ".join(SPILL_FORMATS)}')
+    if how not in ('inner', 'left', 'right', 'outer'):
+        raise ValueError(f'Unsupported merge type: {how}')
+
+    tmp_dir = tempfile.mkdtemp(prefix='diglett-', dir=spill_dir)
+    try:
+        left_dir, right_dir = os.path.join(tmp_dir, 'left'), os.path.join(tmp_dir, 'right')
+        target_dir = out_dir or os.path.join(tmp_dir, 'output')
+        for directory in (left_dir, right_dir, target_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        left_paths, left_schema = _spill(left_chunks, left_on, n_partitions, left_dir, file_format)
+        right_paths, right_schema = _spill(right_chunks, right_on, n_partitions, right_dir, file_format)
+        out_paths = [os.path.join(target_dir, f'part-{i:05d}.{file_format}') for i in range(n_partitions)]
+
+        tasks = [
+            (left_paths[i], right_paths[i], left_schema, right_schema, left_on, right_on, how, suffixes, file_format)
+            + (out_paths[i],)
+            for i in range(n_partitions)
+        ]
+        if processes:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = list(pool.map(_merge_partition, *zip(*tasks)))
+        else:
+            results = [_merge_partition(*task) for task in tasks]
+
+        shutil.rmtree(left_dir)
+        shutil.rmtree(right_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _print_stats(_combine_stats([stats for stats, _ in results]))
+    n_rows = [rows for _, rows in results]
+    print(f'Output rows: {sum(n_rows):,}')
+
+    if out_dir:
+        shutil.rmtree(tmp_dir)
+        return out_paths
+    return PartitionedOutput([path for path, rows in zip(out_paths, n_rows) if rows], file_format, tmp_dir)
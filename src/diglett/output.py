@@ -1,23 +1,272 @@
-"""Functions which produce some sort of output from a DataFrame."""
+"""Functions which produce some sort of output from a DataFrame.
 
-from typing import List, Optional, Union
+Output is rendered as HTML inside a Jupyter notebook, or as plain text anywhere else (e.g. batch jobs),
+so IPython is only imported when actually running inside a notebook.
+"""
 
-from IPython.core.display import display, display_html
+import html
+import itertools
+import logging
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
+
+import numpy as np
 import pandas as pd
-from pandas.io.formats.style import Styler
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pandas.io.formats.style import Styler
+
+logger = logging.getLogger('diglett')
+
+BACKENDS = ('notebook', 'text', 'log')
+_backend: Optional[str] = None
+_table_ids = itertools.count()
+
+
+class HTML:
+    """Minimal stand-in for IPython.display.HTML, which can be created without importing IPython."""
+
+    def __init__(self, data: str) -> None:
+        """Wrap a string of HTML."""
+        self.data = data
+
+    def _repr_html_(self) -> str:
+        return self.data
+
+    def __str__(self) -> str:
+        """Strip tags, for display as plain text."""
+        return html.unescape(re.sub(r'<[^>]+>', '', self.data)).strip()
+
+
+def set_display_backend(backend: Optional[str] = None) -> None:
+    """Force output to 'notebook' (HTML), 'text' (stdout) or 'log' (logging), or None to detect automatically."""
+    global _backend
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f'Expecting backend to be one of: {", ".join(BACKENDS)}')
+    _backend = backend
+
+
+def in_notebook() -> bool:
+    """Check whether we are running inside an IPython kernel (e.g. Jupyter), without importing IPython."""
+    if 'IPython' not in sys.modules:
+        return False
+    shell = sys.modules['IPython'].get_ipython()
+    return getattr(shell, 'kernel', None) is not None
+
+
+def get_display_backend() -> str:
+    """Return the backend used for output, either as set explicitly or detected from the environment."""
+    if _backend is not None:
+        return _backend
+    return 'notebook' if in_notebook() else 'text'
+
+
+def _to_text(obj: Any) -> str:
+    """Render an object which would be displayed in a notebook as plain text."""
+    if hasattr(obj, 'data') and isinstance(obj.data, (pd.DataFrame, pd.Series)):  # Styler
+        caption = getattr(obj, 'caption', None)
+        return obj.data.to_string() + (f'\n{caption}' if caption else '')
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.to_string()
+    return str(obj)
+
+
+def _emit_text(text: str) -> None:
+    """Write plain-text output to the text or log backend."""
+    if get_display_backend() == 'log':
+        logger.info(text)
+    else:
+        print(text)
+
+
+def display(obj: Any) -> None:
+    """Display an object as rich output in a notebook, or as plain text elsewhere."""
+    if get_display_backend() == 'notebook':
+        from IPython.display import display as ipython_display
+
+        ipython_display(obj)
+    else:
+        _emit_text(_to_text(obj))
+
+
+FORMATS = {'int_cols': '{:.0f}', 'pct_cols': '{:.2%}', 'delta_cols': '{:+.2%}'}
+
+# the same formats in printf style, which numpy applies to a whole array at once (after scaling percentages)
+_PRINTF_FORMATS = {'int_cols': ('%.0f', 1), 'pct_cols': ('%.2f%%', 100), 'delta_cols': ('%+.2f%%', 100)}
+
+
+def _infer_formats(
+    columns: pd.Index,
+    int_cols: Optional[List[str]] = None,
+    pct_cols: Optional[List[str]] = None,
+    delta_cols: Optional[List[str]] = None,
+) -> Dict[Any, str]:
+    """Map columns to a key of FORMATS, inferring int and pct columns from their prefix if not given."""
+
+    if int_cols is None:
+        int_cols = [c for c in columns if isinstance(c, str) and (c.startswith('n_') or c.startswith('num_'))]
+
+    if pct_cols is None:
+        pct_cols = [c for c in columns if isinstance(c, str) and (c.startswith('p_') or c.startswith('pct_'))]
+
+    col_formats = {}
+    for key, cols in (('int_cols', int_cols), ('pct_cols', pct_cols), ('delta_cols', delta_cols or [])):
+        col_formats.update({col: key for col in cols})
+    return col_formats
+
+
+def _format_column(values: pd.Series, key: Optional[str]) -> List[str]:
+    """Format a whole column as strings, with one of FORMATS if it is numeric."""
+
+    if key is not None and pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values):
+        fmt, scale = _PRINTF_FORMATS[key]
+        return np.char.mod(fmt, values.to_numpy(dtype='float64', na_value=np.nan) * scale).tolist()
+    return [str(value) for value in values.tolist()]
+
+
+def _table_cells(
+    df: pd.DataFrame,
+    int_cols: Optional[List[str]] = None,
+    pct_cols: Optional[List[str]] = None,
+    delta_cols: Optional[List[str]] = None,
+    hide_index: bool = True,
+) -> Tuple[List[str], List[List[str]], List[bool]]:
+    """Format the headers and cells of each column of a DataFrame, and whether each column is numeric."""
+
+    col_formats = _infer_formats(df.columns, int_cols, pct_cols, delta_cols)
+    headers = [str(col) for col in df.columns]
+    cells = [_format_column(df.iloc[:, i], col_formats.get(col)) for i, col in enumerate(df.columns)]
+    is_numeric = [pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes]
+    if not hide_index:
+        headers = [str(df.index.name or '')] + headers
+        cells = [[str(value) for value in df.index.tolist()]] + cells
+        is_numeric = [False] + is_numeric
+    return headers, cells, is_numeric
+
+
+def _render_text(
+    headers: List[str], cells: List[List[str]], is_numeric: List[bool], caption: Optional[str] = None
+) -> str:
+    """Assemble formatted cells into aligned plain text, with numeric columns aligned right."""
+
+    columns = []
+    for header, col, numeric in zip(headers, cells, is_numeric):
+        width = max(map(len, [header] + col))
+        columns.append([value.rjust(width) if numeric else value.ljust(width) for value in [header] + col])
+    lines = ['  '.join(row).rstrip() for row in zip(*columns)]
+    return '\n'.join(lines) + (f'\n{caption}' if caption else '')
+
+
+def _render_html(
+    headers: List[str],
+    cells: List[List[str]],
+    is_numeric: List[bool],
+    caption: Optional[str] = None,
+    table_attrs: str = '',
+) -> HTML:
+    """Assemble formatted cells into an HTML table, with numeric columns aligned right."""
+
+    # numeric cells need no escaping, and are right-aligned by a single style rule per column
+    cells = [col if numeric else [html.escape(value) for value in col] for col, numeric in zip(cells, is_numeric)]
+    table_id = f'T_diglett_{next(_table_ids)}'
+    rules = ' '.join(
+        f'#{table_id} td:nth-child({i + 1}), #{table_id} th:nth-child({i + 1}) {{text-align: right}}'
+        for i, numeric in enumerate(is_numeric)
+        if numeric
+    )
+
+    style = f'<style>{rules}</style>' if rules else ''
+    attrs = f' {table_attrs}' if table_attrs else ''
+    caption_html = f'<caption style="caption-side: bottom">{html.escape(caption)}</caption>' if caption else ''
+    head = ''.join(f'<th>{html.escape(header)}</th>' for header in headers)
+    body = '\n'.join('<tr><td>' + '</td><td>'.join(row) + '</td></tr>' for row in zip(*cells))
+    return HTML(
+        f'{style}<table id="{table_id}"{attrs}>{caption_html}<thead><tr>{head}</tr></thead>\n'
+        f'<tbody>\n{body}\n</tbody></table>'
+    )
+
+
+def render_table(
+    df: pd.DataFrame,
+    int_cols: Optional[List[str]] = None,
+    pct_cols: Optional[List[str]] = None,
+    delta_cols: Optional[List[str]] = None,
+    hide_index: bool = True,
+    caption: Optional[str] = None,
+    text: bool = False,
+    table_attrs: str = '',
+) -> Union[HTML, str]:
+    """Render a DataFrame as an HTML table or as aligned plain text, with the same formats as format_helper().
+
+    Unlike a pandas Styler, each numeric column is formatted as a whole, and the table is assembled in a single
+    pass, which makes rendering many small tables much faster.
+
+    Args:
+        df: The pandas DataFrame to be rendered.
+        int_cols: Optional hard-coded list of columns to display as integers.
+        pct_cols: Optional hard-coded list of columns to display as percentages.
+        delta_cols: Optional hard-coded list of columns to display as "deltas".
+        hide_index: Whether to hide the index of the DataFrame.
+        caption: Optional caption, displayed below the table.
+        text: Whether to render aligned plain text, rather than HTML.
+        table_attrs: Extra attributes of the HTML table element, e.g. 'style="display:inline"'.
+
+    """
+
+    headers, cells, is_numeric = _table_cells(df, int_cols, pct_cols, delta_cols, hide_index)
+    if text:
+        return _render_text(headers, cells, is_numeric, caption)
+    return _render_html(headers, cells, is_numeric, caption, table_attrs)
+
+
+def _window(
+    df: pd.DataFrame, max_rows: Optional[int] = None, page: Optional[int] = None, page_size: int = 50
+) -> Tuple[pd.DataFrame, Optional[str]]:
+    """Select the rows of a DataFrame to render, and a caption describing them, if they are not all of its rows.
+
+    Either a single page of rows, or (if the DataFrame has more than max_rows rows) its head and tail.
+    """
+
+    n_rows = df.shape[0]
+    if page is not None:
+        n_pages = max(-(-n_rows // page_size), 1)
+        if not 0 <= page < n_pages:
+            raise ValueError(f'Expecting page to be between 0 and {n_pages - 1}')
+        start, stop = page * page_size, min((page + 1) * page_size, n_rows)
+        caption = f'Rows {start + 1:,}–{stop:,} of {n_rows:,} (page {page + 1:,} of {n_pages:,})'
+        return df.iloc[start:stop], caption
+
+    if max_rows is None or n_rows <= max_rows:
+        return df, None
+
+    n_head = max(max_rows - max_rows // 2, 1)
+    n_tail = max_rows - n_head
+    caption = f'Rows 1–{n_head:,} and {n_rows - n_tail + 1:,}–{n_rows:,} of {n_rows:,}'
+    if not n_tail:
+        caption = f'Rows 1–{n_head:,} of {n_rows:,}'
+    return pd.concat([df.iloc[:n_head], df.iloc[n_rows - n_tail:]]), caption
 
 
 def format_helper(
-    df: Union[pd.DataFrame, Styler],
+    df: Union[pd.DataFrame, 'Styler'],
     int_cols: Optional[List[str]] = None,
     pct_cols: Optional[List[str]] = None,
     delta_cols: Optional[List[str]] = None,
     monospace: bool = True,
     hide_index: bool = True,
     return_output: bool = False,
-) -> Optional[Styler]:
+    max_rows: Optional[int] = None,
+    page: Optional[int] = None,
+    page_size: int = 50,
+    engine: str = 'styler',
+) -> Optional[Union['Styler', HTML, str]]:
     """Apply common formatting using pandas.DataFrame.style methods.
 
+    Optionally, only a window of rows of a large DataFrame is formatted, so that the cost of rendering depends on
+    the size of the window rather than of the DataFrame: either its head and tail, or a single page. A caption
+    below the table gives the rows shown. A Styler input is rendered as is.
+
     Args:
         df: The pandas DataFrame to be displayed.
         int_cols: Optional hard-coded list of columns to display as integers.
@@ -26,30 +275,40 @@ def format_helper(
         monospace: Whether to display with monospace font.
         hide_index: Whether to hide the index of the DataFrame.
         return_output: This is only used for testing purposes.
+        max_rows: If given, display only the head and tail of DataFrames with more rows than this.
+        page: Display only this (zero-based) page of rows, instead of the head and tail.
+        page_size: The number of rows per page.
+        engine: Either 'styler', or 'fast' to render a DataFrame with render_table() instead of a pandas Styler.
+            The fast engine ignores the monospace option.
 
     """
 
+    if engine not in ('styler', 'fast'):
+        raise ValueError('Expecting engine to be one of: styler, fast')
+
+    caption = None
     if isinstance(df, pd.core.frame.DataFrame):
+        df, caption = _window(df, max_rows=max_rows, page=page, page_size=page_size)
+        if engine == 'fast':
+            text = get_display_backend() != 'notebook'
+            output = render_table(
+                df, int_cols, pct_cols, delta_cols, hide_index=hide_index, caption=caption, text=text
+            )
+            if return_output:
+                return output
+            display(output)
+            return None
         output = df.style
-    elif isinstance(df, Styler):
-        output = df
     else:
-        raise ValueError
-
-    formats = {'int_cols': '{:.0f}', 'pct_cols': '{:.2%}', 'delta_cols': '{:+.2%}'}
-
-    if int_cols is None:
-        int_cols = [c for c in df.columns if (str.startswith(c, 'n_') or str.startswith(c, 'num_'))]
-
-    if pct_cols is None:
-        pct_cols = [c for c in df.columns if (str.startswith(c, 'p_') or str.startswith(c, 'pct_'))]
+        from pandas.io.formats.style import Styler
 
-    output = output.format({col: formats['int_cols'] for col in int_cols}).format(
-        {col: formats['pct_cols'] for col in pct_cols}
-    )
+        if not isinstance(df, Styler):
+            raise ValueError
+        output = df
 
-    if delta_cols:
-        delta_cols = output.format({col: formats['delta_cols'] for col in delta_cols})
+    # compile one formatter per column, and apply them all at once
+    col_formats = _infer_formats(df.columns, int_cols, pct_cols, delta_cols)
+    output = output.format({col: FORMATS[key].format for col, key in col_formats.items()})
 
     if monospace:
         output = output.set_properties(**{'font-family': 'Menlo'})
@@ -57,6 +316,11 @@ def format_helper(
     if hide_index:
         output = output.hide_index()
 
+    if caption:
+        output = output.set_caption(caption).set_table_styles(
+            [{'selector': 'caption', 'props': [('caption-side', 'bottom')]}], overwrite=False
+        )
+
     if return_output:
         return output
     else:
@@ -66,10 +330,14 @@ def format_helper(
 
 def display_side_by_side(*args: pd.DataFrame) -> None:  # pragma: no cover
     """Output an array of pandas DataFrames side-by-side in a Jupyter notebook to conserve vertical space."""
-    html_str = ''
-    for df in args:
-        html_str += df.to_html()
-    display_html(html_str.replace('table', 'table style="display:inline"'), raw=True)
+    if get_display_backend() != 'notebook':
+        _emit_text('\n\n'.join(_render_text(*_table_cells(df, hide_index=False)) for df in args))
+        return
+
+    html_str = ''.join(
+        _render_html(*_table_cells(df, hide_index=False), table_attrs='style="display:inline"').data for df in args
+    )
+    display(HTML(html_str))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,127 @@
+"""Profile whole DataFrame.pipe() chains, stage by stage."""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .utils import profile_call
+
+Stage = Union[Callable, Tuple[Callable, Dict[str, Any]]]
+
+REPORT_COLS = [
+    'stage',
+    'func',
+    'wall_sec',
+    'pct_time',
+    'cpu_sec',
+    'peak_mem_bytes',
+    'mem_delta_bytes',
+    'rows_in',
+    'rows_out',
+    'rows_delta',
+]
+
+
+class Pipeline:
+    """A sequence of pipe functions which records time, memory and row counts of each stage when run.
+
+    Stages are added the same way as with DataFrame.pipe(), and the pipeline itself can be piped:
+
+    >>> pipeline = Pipeline().pipe(fillnas, subset=['num_']).pipe(group_other, n=5)
+    >>> result = df.pipe(pipeline)
+    >>> pipeline.report()
+
+    Args:
+        stages: Optional initial stages, each either a function or a tuple of (function, kwargs).
+        name: Name of the pipeline, used as the root frame of collapsed stacks.
+        trace_memory: Whether to track peak allocations of each stage with tracemalloc.
+
+    """
+
+    def __init__(
+        self,
+        stages: Optional[Iterable[Stage]] = None,
+        name: str = 'pipeline',
+        trace_memory: bool = True,
+    ) -> None:
+        """Initialize a pipeline from an optional list of stages."""
+        self.name = name
+        self.trace_memory = trace_memory
+        self.stages: List[Tuple[Callable, Tuple[Any, ...], Dict[str, Any]]] = []
+        self.records: List[Dict[str, Any]] = []
+
+        for stage in stages or []:
+            if isinstance(stage, tuple):
+                func, kwargs = stage
+                self.pipe(func, **kwargs)
+            else:
+                self.pipe(stage)
+
+    def __call__(self, data: Any) -> Any:
+        """Run the pipeline, so that it can itself be used in DataFrame.pipe()."""
+        return self.run(data)
+
+    def pipe(self, func: Callable, *args: Any, **kwargs: Any) -> 'Pipeline':
+        """Append a stage to the pipeline, given a function and any extra arguments to call it with."""
+        self.stages.append((func, args, kwargs))
+        return self
+
+    def run(self, data: Any) -> Any:
+        """Pass data through each stage in turn, profiling each one, and return the final output."""
+
+        self.records = []
+        for i, (func, args, kwargs) in enumerate(self.stages):
+            data, record = profile_call(func, (data, *args), kwargs, trace_memory=self.trace_memory)
+            record['stage'] = i
+
+            post_shape = getattr(data, 'shape', None)
+            record['rows_in'] = record['n_rows']
+            record['rows_out'] = post_shape[0] if post_shape else None
+            if record['rows_in'] is not None and record['rows_out'] is not None:
+                record['rows_delta'] = record['rows_out'] - record['rows_in']
+            else:
+                record['rows_delta'] = None
+            if record['mem_in_bytes'] is not None and record['mem_out_bytes'] is not None:
+                record['mem_delta_bytes'] = record['mem_out_bytes'] - record['mem_in_bytes']
+            else:
+                record['mem_delta_bytes'] = None
+
+            self.records.append(record)
+
+        return data
+
+    def report(self) -> pd.DataFrame:
+        """Return one row per stage of the last run, ranked from slowest to fastest."""
+
+        df = pd.DataFrame(self.records, columns=[c for c in REPORT_COLS if c != 'pct_time'])
+        df['pct_time'] = df['wall_sec'] / df['wall_sec'].sum()
+        return df.reindex(REPORT_COLS, axis=1).sort_values('wall_sec', ascending=False).reset_index(drop=True)
+
+    def collapsed_stacks(self, metric: str = 'wall_sec', path: Optional[str] = None) -> Optional[str]:
+        """Export the last run in the "collapsed stack" format read by flamegraph.pl and speedscope.
+
+        Args:
+            metric: One of 'wall_sec', 'cpu_sec' (both exported as microseconds) or 'peak_mem_bytes'.
+            path: If given, write to this file instead of returning a string.
+
+        """
+
+        if metric not in ('wall_sec', 'cpu_sec', 'peak_mem_bytes'):
+            raise ValueError(f'Unsupported metric: {metric}')
+        scale = 10 ** 6 if metric.endswith('_sec') else 1
+
+        lines = [
+            f'{self.name};{record["stage"]}:{record["func"]} {int(round((record[metric] or 0) * scale))}'
+            for record in self.records
+        ]
+        output = '\n'.join(lines) + '\n'
+
+        if path is None:
+            return output
+        with open(path, 'w') as f:
+            f.write(output)
+        return None
+
+
+if __name__ == '__main__':
+    pass  # pragma: no cover
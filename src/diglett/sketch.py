@@ -0,0 +1,254 @@
+"""Bounded-memory summaries of data too large to hold in memory at once.
+
+- Each summary is updated one chunk at a time, e.g. from read_csv(chunksize=…).
+- Summaries built over different chunks (e.g. in different workers) can be merged.
+"""
+
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+class HeavyHitters:
+    """Misra-Gries summary of the keys with the largest total (non-negative) weight in a stream.
+
+    At most `capacity` keys are tracked. The tracked total of each key is a lower bound, which underestimates
+    the true total by at most `error`, and any key whose true total exceeds `error` is guaranteed to be tracked.
+
+    Args:
+        capacity: The maximum number of keys to track.
+
+    """
+
+    def __init__(self, capacity: int = 1000) -> None:
+        """Initialize an empty summary."""
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='float64')
+        self.total = 0.0
+        self.error = 0.0
+
+    def update(self, counts: pd.Series, total: Optional[float] = None) -> 'HeavyHitters':
+        """Add a chunk of weights, as a Series indexed by key (e.g. the output of a groupby sum).
+
+        Args:
+            counts: The weight of each key. Keys may be repeated.
+            total: The total weight of the chunk, if greater than counts.sum(), e.g. due to null keys.
+
+        """
+
+        if (counts < 0).any():
+            raise ValueError('Expecting non-negative weights')
+
+        counts = counts.groupby(level=list(range(counts.index.nlevels))).sum().astype('float64')
+        self.total += float(counts.sum() if total is None else total)
+        return self._combine(counts)
+
+    def merge(self, other: 'HeavyHitters') -> 'HeavyHitters':
+        """Merge another summary into this one, e.g. one built by a different worker."""
+        self.total += other.total
+        self.error += other.error
+        return self._combine(other.counts)
+
+    def top(self, n: int = 10) -> pd.Series:
+        """Return the lower-bound totals of the N heaviest keys, in descending order."""
+        return self.counts.sort_values(ascending=False, kind='mergesort').head(n)
+
+    def _combine(self, counts: pd.Series) -> 'HeavyHitters':
+        """Add counters for a set of (unique) keys, then decrement all counters until at most `capacity` remain."""
+
+        if self.counts.empty:
+            combined = counts
+        else:
+            combined = self.counts.add(counts, fill_value=0)
+
+        if combined.shape[0] > self.capacity:
+            values = combined.to_numpy()
+            # subtracting the (capacity + 1)th largest counter leaves at most `capacity` positive counters
+            decrement = np.partition(values, values.shape[0] - self.capacity - 1)[values.shape[0] - self.capacity - 1]
+            combined = (combined - decrement).loc[lambda x: x > 0]
+            self.error += decrement
+
+        self.counts = combined
+        return self
+
+
+class QuantileSketch:
+    """KLL summary of the distribution of a numeric stream, from which approximate quantiles can be read.
+
+    Values are kept in a stack of compactors: when a level overflows, its sorted values are halved (keeping every
+    other value, from a random offset) and promoted to the next level, where each value stands for twice as many.
+    Lower levels have geometrically smaller capacities, so at most about 3k values are stored. The rank error of
+    quantiles shrinks in proportion to 1/k, and quantiles are exact until the first compaction.
+
+    Args:
+        k: The capacity of the top level. Higher is more accurate.
+        seed: Optional seed of the random offsets of compactions, for reproducible results.
+
+    """
+
+    def __init__(self, k: int = 1000, seed: Optional[int] = None) -> None:
+        """Initialize an empty summary."""
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: Union[pd.Series, np.ndarray]) -> 'QuantileSketch':
+        """Add a chunk of values. Nulls are ignored."""
+
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.shape[0]:
+            self.count += values.shape[0]
+            self.min = np.fmin(self.min, values.min())
+            self.max = np.fmax(self.max, values.max())
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Merge another summary into this one, e.g. one built by a different worker."""
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q: Union[float, List[float]]) -> Union[float, np.ndarray]:
+        """Return the approximate value at each quantile q (a float or list of floats), or NaN if empty."""
+
+        qs = np.asarray(q, dtype='float64')
+        if not self.count:
+            return np.full(qs.shape, np.nan) if qs.ndim else np.nan
+        if len(self.levels) == 1:
+            # no values were compacted yet, so use the same (linear) interpolation as pandas
+            return np.quantile(self.levels[0], qs)
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.shape[0], 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='mergesort')
+        cum_weights = np.cumsum(weights[order])
+
+        positions = np.searchsorted(cum_weights, qs * cum_weights[-1], side='left')
+        result = values[order][np.minimum(positions, values.shape[0] - 1)]
+        result = np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, result))
+        return result if qs.ndim else float(result)
+
+    def _capacity(self, h: int) -> int:
+        """The capacity of level h, which shrinks by 2/3 for every level below the top one."""
+        return max(int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - h))), 2)
+
+    def _compress(self) -> None:
+        """Compact every level which is over capacity, from the bottom up, into the level above it."""
+
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.shape[0] > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                # an odd value out stays at this level, and every other remaining value is promoted
+                n_even = level.shape[0] - level.shape[0] % 2
+                offset = self._rng.integers(2)
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], level[offset:n_even:2]])
+                self.levels[h] = level[n_even:]
+            h += 1
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Count the significant bits of each of an array of uint64, exactly, via two halves of 32 bits."""
+    high = (values >> np.uint64(32)).astype('float64')
+    low = (values & np.uint64(0xFFFFFFFF)).astype('float64')
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def _hash_numbers(values: np.ndarray) -> np.ndarray:
+    """Hash numbers so that equal values hash the same whatever their dtype.
+
+    Whole numbers within the range of int64 are hashed as int64, which keeps large integer ids distinct, and any
+    other number as a float64.
+    """
+
+    if values.dtype.kind == 'f':
+        values = values + 0.0  # n.b. also turns -0.0 into 0.0
+        is_int = (np.floor(values) == values) & (values >= -(2.0 ** 63)) & (values < 2.0 ** 63)
+    elif values.dtype.kind == 'u':
+        is_int = values <= np.iinfo('int64').max
+    elif values.dtype.kind in 'bi':
+        is_int = np.ones(values.shape[0], dtype=bool)
+    else:
+        return pd.util.hash_array(values)
+
+    hashes = np.empty(values.shape[0], dtype='uint64')
+    hashes[is_int] = pd.util.hash_array(values[is_int].astype('int64'))
+    hashes[~is_int] = pd.util.hash_array(values[~is_int].astype('float64'))
+    return hashes
+
+
+class HyperLogLog:
+    """HyperLogLog estimate of the number of distinct values in a stream, in a fixed amount of memory.
+
+    Each value is hashed to 64 bits: the first p bits pick one of 2^p registers, which keeps the highest rank (the
+    position of the first set bit) of the remaining bits. The relative error of the estimate is about
+    1.04 / sqrt(2^p), e.g. 0.8% for p=14, with 16 KB of registers. Whole numbers are hashed as int64, and other
+    numbers as floats, so that a value counts once whatever the dtype of the chunk it appears in.
+
+    Args:
+        p: The number of bits which pick a register. Higher is more accurate.
+
+    """
+
+    def __init__(self, p: int = 14) -> None:
+        """Initialize an empty summary."""
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype='uint8')
+
+    def update(self, values: Union[pd.Series, np.ndarray]) -> 'HyperLogLog':
+        """Add a chunk of values. Nulls are ignored."""
+
+        srs = pd.Series(values)
+        srs = srs[srs.notnull()]
+        if pd.api.types.is_numeric_dtype(srs.dtype):
+            hashes = _hash_numbers(srs.to_numpy(dtype=getattr(srs.dtype, 'numpy_dtype', srs.dtype)))
+        else:
+            hashes = pd.util.hash_pandas_object(srs, index=False).to_numpy()
+
+        n_bits = 64 - self.p
+        registers = (hashes >> np.uint64(n_bits)).astype('intp')
+        ranks = n_bits + 1 - _bit_length(hashes & np.uint64((1 << n_bits) - 1))
+        np.maximum.at(self.registers, registers, ranks.astype('uint8'))
+        return self
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Merge another summary into this one, e.g. one built by a different worker."""
+        if other.p != self.p:
+            raise ValueError('Expecting summaries with the same precision')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        """Return the estimated number of distinct values."""
+
+        m = self.registers.shape[0]
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype('int64')))
+
+        # with few values, count the empty registers instead (linear counting)
+        n_empty = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and n_empty:
+            estimate = m * np.log(m / n_empty)
+        return float(estimate)
+
+
+if __name__ == '__main__':
+    pass  # pragma: no cover
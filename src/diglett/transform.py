@@ -1,9 +1,15 @@
 """Tools for transforming input data into more usable form."""
 
-from typing import Any, List, Optional, Union
+import functools
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import warnings
 
 import numpy as np
 import pandas as pd
+from pandas.api.indexers import BaseIndexer
+from pandas.tseries.frequencies import to_offset
+
+from .sketch import QuantileSketch
 
 
 def reindex_by_sum(df: pd.DataFrame, axis: int = 1, margin_col: str = None) -> pd.DataFrame:
@@ -27,24 +33,39 @@ def reindex_by_sum(df: pd.DataFrame, axis: int = 1, margin_col: str = None) -> p
 def fillnas(
     input_df: pd.DataFrame,
     subset: Optional[List[str]] = None,
-    value: Any = 0,
-) -> pd.DataFrame:
+    value: Union[Any, Dict[str, Any]] = 0,
+    inplace: bool = False,
+) -> Optional[pd.DataFrame]:
     """Apply fillna to a subset of columns.
 
     Roughly equivalent to df[subset] = df[subset].fillna(value)
 
+    Only columns which contain nulls are filled, in place rather than by assigning new columns, which on wide
+    frames would split the underlying blocks of columns one at a time. With inplace=True, input_df is filled
+    without copying it first.
+
     Args:
         input_df: The DataFrame to operate on.
-        subset: A list of the columns to operate on.
-        value: The value with which to fill nulls.
+        subset: A list of the columns to operate on. Defaults to the keys of value if it is a dict, else all columns.
+        value: The value with which to fill nulls, or a dict of values per column.
+        inplace: Whether to fill input_df itself and return None, rather than returning a filled copy.
     """
 
-    output_df = input_df.copy()
+    values = value if isinstance(value, dict) else None
     if subset is None:
-        subset = output_df.columns.tolist()
-    for col in subset:
-        output_df[col] = input_df[col].fillna(value)
-    return output_df
+        subset = list(values) if values is not None else input_df.columns.tolist()
+    if values is None:
+        values = {col: value for col in subset}
+
+    fills = {col: values[col] for col in subset if col in values and values[col] is not None}
+    has_nulls = input_df[list(fills)].isnull().any()
+    fills = {col: fill for col, fill in fills.items() if has_nulls[col]}
+
+    output_df = input_df if inplace else input_df.copy()
+    if fills:
+        output_df.fillna(fills, inplace=True)
+
+    return None if inplace else output_df
 
 
 def winsorize(
@@ -74,20 +95,320 @@ def winsorize(
     return trimmed
 
 
-def multi_moving_average(
+def _clip(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Clip values between (broadcast) bounds, leaving nulls as is, and skipping bounds which are null."""
+    values = np.where(values < lower, lower, values)
+    return np.where(values > upper, upper, values)
+
+
+def winsorize_df(
     df: pd.DataFrame,
-    window: int = 7,
-    min_periods: int = 1,
+    cols: Optional[List[str]] = None,
+    lower: Union[int, float] = 0,
+    upper: Union[int, float] = 0.99,
+    by: Optional[Union[str, List[str]]] = None,
+    thresholds: Optional[pd.DataFrame] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Winsorize many columns of a DataFrame at once, optionally within each group, e.g. per country.
+
+    All thresholds are computed with a single quantile call (across columns, or across groups), and all columns
+    are clipped in one broadcast operation.
+
+    Args:
+        df: The DataFrame to be winsorized.
+        cols: The columns to winsorize. Defaults to all numeric columns (besides those in by).
+        lower: Values below this quantile get winsorized.
+        upper: Values above this quantile get winsorized.
+        by: Optional column(s) within whose groups to compute quantiles separately.
+        thresholds: Thresholds returned by a previous call, to winsorize new data the same way, instead of
+            computing them from df. Values in groups without thresholds are left as is.
+
+    Returns:
+        The winsorized DataFrame, and the thresholds, with columns (lower, upper) and one row per column,
+        or per (group…, column) if by is given.
+
+    """
+
+    by = [by] if isinstance(by, str) else list(by or [])
+    if cols is None:
+        cols = [col for col in df.select_dtypes('number').columns if col not in by]
+    values = df[cols].to_numpy(dtype='float64', na_value=np.nan)
+
+    if not by:
+        if thresholds is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', category=RuntimeWarning)  # all-null columns
+                lower_vals, upper_vals = np.nanquantile(values, [lower, upper], axis=0)
+            thresholds = pd.DataFrame(
+                {'lower': lower_vals, 'upper': upper_vals}, index=pd.Index(cols, name='column')
+            )
+        bounds = thresholds.reindex(cols)
+        clipped = _clip(values, bounds['lower'].to_numpy()[None, :], bounds['upper'].to_numpy()[None, :])
+
+    else:
+        grouped = df.groupby(by, sort=False)
+        if thresholds is None:
+            quantiles = grouped[cols].quantile([lower, upper])
+            if quantiles.empty:
+                # e.g. every group key is null, so there are no groups, and no values are clipped
+                names = by + ['column']
+                empty_index = pd.MultiIndex.from_arrays([[]] * len(names), names=names)
+                thresholds = pd.DataFrame({'lower': [], 'upper': []}, index=empty_index, dtype='float64')
+            else:
+                thresholds = pd.concat(
+                    {
+                        'lower': quantiles.xs(lower, level=-1).rename_axis('column', axis=1).stack(dropna=False),
+                        'upper': quantiles.xs(upper, level=-1).rename_axis('column', axis=1).stack(dropna=False),
+                    },
+                    axis=1,
+                ).sort_index()
+
+        # look up the thresholds of each group once, then broadcast them to the rows of the group
+        group_keys = grouped.size().index
+        lower_wide = thresholds['lower'].unstack('column').reindex(group_keys).reindex(cols, axis=1).to_numpy()
+        upper_wide = thresholds['upper'].unstack('column').reindex(group_keys).reindex(cols, axis=1).to_numpy()
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype='int64')
+        # rows with a null group key (code -1) look up the row of nulls appended at the end
+        nulls = np.full((1, len(cols)), np.nan)
+        clipped = _clip(values, np.vstack([lower_wide, nulls])[codes], np.vstack([upper_wide, nulls])[codes])
+
+    output = pd.concat(
+        [df.drop(columns=cols), pd.DataFrame(clipped, index=df.index, columns=cols)], axis=1
+    ).reindex(df.columns, axis=1)
+    return output, thresholds
+
+
+def winsorize_thresholds(
+    chunks: Iterable[pd.DataFrame],
+    cols: Optional[List[str]] = None,
+    lower: Union[int, float] = 0,
+    upper: Union[int, float] = 0.99,
+    k: int = 1000,
+    seed: Optional[int] = None,
 ) -> pd.DataFrame:
-    """Apply a moving average to a DataFrame with a 2-level index, where the second is a dimension.
+    """Estimate winsorize thresholds of each column from a table which is read in chunks, with bounded memory.
+
+    This is the first pass of streaming winsorization: the thresholds can then be applied to the chunks of a
+    second pass with winsorize_stream(). Quantiles are estimated with one QuantileSketch per column, so they are
+    approximate (within a rank error of roughly 2/k) once a column has more than about k values.
 
     Args:
-        df: The DataFrame to operate on.
-        window: Passed directly as argument to df.rolling()
-        min_periods: Passed directly as argument to df.rolling()
+        chunks: An iterable of DataFrames with the same columns, e.g. from pd.read_csv(chunksize=…).
+        cols: The columns to winsorize. Defaults to all numeric columns of the first chunk.
+        lower: Values below this quantile get winsorized.
+        upper: Values above this quantile get winsorized.
+        k: The size of each sketch. Higher is more accurate.
+        seed: Optional seed, for reproducible estimates.
+
+    Returns:
+        The thresholds, with columns (lower, upper) and one row per column, as returned by winsorize_df().
+
+    """
+
+    sketches: Dict[str, QuantileSketch] = {}
+    for chunk in chunks:
+        if not sketches:
+            cols = cols or chunk.select_dtypes('number').columns.tolist()
+            sketches = {col: QuantileSketch(k=k, seed=seed) for col in cols}
+        for col, sketch in sketches.items():
+            sketch.update(chunk[col])
+
+    return pd.DataFrame(
+        [sketch.quantile([lower, upper]) for sketch in sketches.values()],
+        index=pd.Index(list(sketches), name='column'),
+        columns=['lower', 'upper'],
+        dtype='float64',
+    )
+
+
+def winsorize_stream(chunks: Iterable[pd.DataFrame], thresholds: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    """Winsorize a table which is read in chunks, one chunk at a time, using thresholds from winsorize_thresholds().
+
+    Args:
+        chunks: An iterable of DataFrames with the same columns, e.g. from pd.read_csv(chunksize=…).
+        thresholds: Thresholds, with columns (lower, upper) and one row per column to winsorize.
+
+    Yields:
+        Each chunk, winsorized.
+
+    """
+
+    cols = thresholds.index.tolist()
+    for chunk in chunks:
+        yield winsorize_df(chunk, cols=cols, thresholds=thresholds)[0]
+
+
+def _panel_layout(index: pd.MultiIndex, freq: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, pd.Index]:
+    """Lay out the complete panel of a (ds, dim) index dim by dim, from the first to the last date of each dim.
+
+    Returns the ds (in nanoseconds) and dim code of each row of the complete panel, the position of each row of
+    the index within it, and the dims, which are sorted.
+    """
+
+    # dates with a time zone are laid out in local time, so that days stay evenly spaced across DST changes
+    step = to_offset(freq).nanos
+    ds = pd.DatetimeIndex(index.get_level_values(0)).tz_localize(None).asi8
+    codes, dims = pd.factorize(index.get_level_values(1), sort=True)
+    if (codes == -1).any():
+        raise ValueError('Expecting no null dims')
+    if not index.is_unique:
+        raise ValueError('Expecting each (ds, dim) to be unique')
+
+    bounds = pd.Series(ds).groupby(codes).agg(['min', 'max'])
+    first, last = bounds['min'].to_numpy(), bounds['max'].to_numpy()
+    offsets, remainders = np.divmod(ds - first[codes], step)
+    if remainders.any():
+        raise ValueError(f'Expecting every ds to be a whole number of {freq} after the first ds of its dim')
+
+    lengths = (last - first) // step + 1
+    seg_starts = np.cumsum(lengths) - lengths
+    full_codes = np.repeat(np.arange(dims.shape[0]), lengths)
+    full_ds = np.repeat(first, lengths) + (np.arange(lengths.sum()) - np.repeat(seg_starts, lengths)) * step
+    return full_ds, full_codes, seg_starts[codes] + offsets, dims
+
+
+def _fill_rows(
+    srs: pd.Series, source: np.ndarray, fill_value: Any
+) -> Union[np.ndarray, pd.api.extensions.ExtensionArray]:
+    """Take the values of a Series at positions, filling the positions -1 with fill_value.
+
+    Like reindex(), the column is only upcast to hold fill_value if any rows are filled, and then to object if its
+    dtype can't hold fill_value at all (e.g. a string in a categorical or nullable integer column).
+    """
+    values = srs.to_numpy() if isinstance(srs.dtype, np.dtype) else srs.array
+    if not (source == -1).any():
+        return values.take(source)
+    try:
+        return pd.api.extensions.take(values, source, allow_fill=True, fill_value=fill_value)
+    except (TypeError, ValueError):
+        return pd.api.extensions.take(values.astype(object), source, allow_fill=True, fill_value=fill_value)
+
+
+def complete_panel(df: pd.DataFrame, freq: str = 'D', fill_value: Union[Any, Dict] = np.nan) -> pd.DataFrame:
+    """Add the missing dates of each dimension of a DataFrame with a (ds, dim) index, as rows of fill_value.
+
+    Each dimension is completed only between its own first and last dates, so that sparse panels (e.g. of
+    dimensions which come and go) stay small. The output is sorted by (ds, dim), like df.sort_index().
+
+    Args:
+        df: A DataFrame with a 2-level index, of dates and then of dimensions.
+        freq: The fixed frequency of the dates, e.g. 'D' or '1H'.
+        fill_value: The value of the added rows, or a dict of them per column.
+
+    """
+
+    assert df.index.nlevels == 2, 'Expecting two levels of index'
+    full_ds, full_codes, positions, dims = _panel_layout(df.index, freq)
+
+    # from dim by dim, to ds by ds
+    order = np.lexsort((full_codes, full_ds))
+    rows = np.empty_like(order)
+    rows[order] = np.arange(order.shape[0])
+    rows = rows[positions]
+
+    ds_codes, ds_values = pd.factorize(full_ds[order])
+    ds_level = pd.DatetimeIndex(ds_values.view('M8[ns]'))
+    tz = getattr(df.index.levels[0], 'tz', None)
+    if tz is not None:
+        ds_level = ds_level.tz_localize(tz)
+    index = pd.MultiIndex(
+        levels=[ds_level, dims], codes=[ds_codes, full_codes[order]], names=df.index.names, verify_integrity=False
+    )
+
+    # each row of the output is taken from its row of the input, or from -1 for added rows, filled as by reindex()
+    source = np.full(order.shape[0], -1)
+    source[rows] = np.arange(df.shape[0])
+    fills = fill_value if isinstance(fill_value, dict) else dict.fromkeys(df.columns, fill_value)
+    columns = {i: _fill_rows(df.iloc[:, i], source, fills.get(col, np.nan)) for i, col in enumerate(df.columns)}
+    output = pd.DataFrame(columns, index=index)
+    output.columns = df.columns
+    return output
+
 
+def _group_segments(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Order rows by their dim code, keeping their order within each dim, as contiguous segments.
+
+    Returns the row positions in that order, the position at which the segment of each (ordered) row starts, and
+    whether each (ordered) row has a null dim (code -1), which like groupby() belongs to no segment.
+    """
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+
+    positions = np.arange(order.shape[0])
+    is_start = np.ones(order.shape[0], dtype=bool)
+    is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts = np.maximum.accumulate(np.where(is_start, positions, 0)) if order.shape[0] else positions
+    return order, starts, sorted_codes == -1
+
+
+class _SegmentWindows(BaseIndexer):
+    """Windows of window_size rows which end at each row, and start no earlier than the first row of its segment.
+
+    Its starts attribute gives the position at which the segment of each row starts, as from _group_segments().
+    """
+
+    # pandas checks that the signature matches that of its own version of BaseIndexer
+    @functools.wraps(BaseIndexer.get_window_bounds)
+    def get_window_bounds(self, num_values: int = 0, *args: Any, **kwargs: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the start and end (exclusive) of the window of each row."""
+        ends = np.arange(1, num_values + 1, dtype='int64')
+        return np.maximum(ends - self.window_size, self.starts).astype('int64'), ends
+
+
+def _rolling_mean(values: np.ndarray, starts: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    """Compute the rolling mean of every column of a 2-D array within segments.
+
+    All segments go through a single call of the same (compensated) rolling kernel as a rolling mean per group,
+    with windows which restart at each segment, so that the output is exactly the same. Like pandas, nulls are
+    skipped, and a window needs at least min_periods non-null values.
     """
+    windows = _SegmentWindows(window_size=window, starts=starts)
+    return pd.DataFrame(values).rolling(windows, min_periods=min_periods).mean().to_numpy()
+
+
+def _ewm_mean(values: np.ndarray, starts: np.ndarray, span: float, min_periods: int) -> np.ndarray:
+    """Compute the exponentially weighted mean of every column of a 2-D array within segments.
+
+    This steps through the same recursion as pandas' ewm(span=span, min_periods=min_periods).mean(), for the k-th
+    row of every segment at once, so it loops once per row of the longest segment rather than once per row.
+    """
+
+    old_wt_factor = 1.0 - 1.0 / (1.0 + (span - 1) / 2)
+    min_periods = max(min_periods, 1)
+
+    # longest segments first, so that the segments which still have a k-th row are always a prefix
+    seg_starts, seg_lengths = np.unique(starts, return_counts=True)
+    by_length = np.argsort(-seg_lengths, kind='stable')
+    seg_starts, seg_lengths = seg_starts[by_length], seg_lengths[by_length]
+    n_active = np.searchsorted(-seg_lengths, -np.arange(seg_lengths[:1].sum()), side='left')
 
+    weighted = np.full((seg_starts.shape[0], values.shape[1]), np.nan)
+    old_wt = np.ones_like(weighted)
+    n_obs = np.zeros_like(weighted)
+    output = np.empty_like(values)
+
+    for k, n in enumerate(n_active):
+        rows = seg_starts[:n] + k
+        cur, prev, wt = values[rows], weighted[:n], old_wt[:n]
+        is_obs = ~np.isnan(cur)
+        has_prev = ~np.isnan(prev)
+        n_obs[:n] += is_obs
+
+        wt = np.where(has_prev, wt * old_wt_factor, wt)
+        is_update = has_prev & is_obs
+        with np.errstate(invalid='ignore'):
+            blended = (wt * prev + cur) / (wt + 1.0)
+        prev = np.where(is_update & (prev != cur), blended, prev)
+        prev = np.where(~has_prev & is_obs, cur, prev)
+
+        weighted[:n], old_wt[:n] = prev, np.where(is_update, wt + 1.0, wt)
+        output[rows] = np.where(n_obs[:n] >= min_periods, prev, np.nan)
+    return output
+
+
+def _check_panel(df: pd.DataFrame) -> None:
+    """Check that a DataFrame is a numeric panel, indexed by (ds, dim)."""
     assert (
         df.select_dtypes(include=np.number).columns.tolist() == df.columns.tolist()
     ), 'Expecting all columns to be numeric'
@@ -96,11 +417,179 @@ def multi_moving_average(
         df.index.get_level_values(1).dtype == 'object'
     ), 'Expecting second level of index to be a string (dim)'
 
-    return (
-        df.sort_index()
-        .groupby(level=1)
-        .transform(lambda x: x.rolling(window=window, min_periods=min_periods).mean())
-    )
+
+def _moving_averages(
+    values: np.ndarray, codes: np.ndarray, windows: List[int], min_periods: int, spans: List[float]
+) -> Tuple[np.ndarray, List[str]]:
+    """Compute the moving averages of rows in order of ds, within each dim code, side by side.
+
+    Returns them in the order of the input rows, with the column suffix of each moving average.
+    """
+
+    order, starts, is_null = _group_segments(codes)
+    values = values[order]
+
+    results = [(f'_ma{w}', _rolling_mean(values, starts, w, min_periods)) for w in windows]
+    results += [(f'_ewm{span}', _ewm_mean(values, starts, span, min_periods)) for span in spans]
+
+    means = np.hstack([result for _, result in results]) if results else np.empty((values.shape[0], 0))
+    means[is_null] = np.nan
+    output = np.empty_like(means)
+    output[order] = means
+    return output, [suffix for suffix, _ in results]
+
+
+def multi_moving_average(
+    df: pd.DataFrame,
+    window: Union[int, str, List[Union[int, str]]] = 7,
+    min_periods: int = 1,
+    spans: Optional[List[float]] = None,
+    freq: str = 'D',
+) -> pd.DataFrame:
+    """Apply a moving average to a DataFrame with a 2-level index, where the second is a dimension.
+
+    All dimensions and columns are computed at once, over rows ordered by (dim, ds), with windows which restart at
+    each dimension. Several windows, and exponentially weighted averages, share that ordering. Their output is
+    wide, with columns suffixed by _ma{window} and _ewm{span}, e.g. num_A_ma7 and num_A_ewm28.
+
+    A window of a number of rows ignores missing dates, whereas a time-based window (e.g. '7D') is computed over
+    the complete panel (see complete_panel()), where missing dates are nulls, as in df.rolling('7D').
+
+    Args:
+        df: The DataFrame to operate on.
+        window: Passed directly as argument to df.rolling(), or a list of windows to compute. Either numbers of
+            rows, or time offsets which are multiples of freq.
+        min_periods: Passed directly as argument to df.rolling() and df.ewm()
+        spans: Optional list of spans of exponentially weighted averages, as in df.ewm(span=…).mean()
+        freq: The frequency of the dates, for time-based windows.
+
+    """
+
+    _check_panel(df)
+    windows = [window] if isinstance(window, (int, str)) else list(window)
+    spans = list(spans or [])
+
+    df = df.sort_index()
+    values = df.to_numpy(dtype='float64', na_value=np.nan)
+    row_windows = [w for w in windows if not isinstance(w, str)]
+
+    if len(row_windows) == len(windows):
+        codes, _ = pd.factorize(df.index.get_level_values(1))
+        output, suffixes = _moving_averages(values, codes, row_windows, min_periods, spans)
+    elif not row_windows:
+        step = to_offset(freq).nanos
+        n_rows = [pd.Timedelta(w).value // step for w in windows]
+        if any(n * step != pd.Timedelta(w).value or n < 1 for w, n in zip(windows, n_rows)):
+            raise ValueError(f'Expecting time-based windows to be multiples of {freq}')
+
+        # the rows of the input are scattered into the complete panel, and gathered back after
+        _, codes, positions, _ = _panel_layout(df.index, freq)
+        complete_values = np.full((codes.shape[0], values.shape[1]), np.nan)
+        complete_values[positions] = values
+        output, _ = _moving_averages(complete_values, codes, n_rows, min_periods, spans)
+        output = output[positions]
+        suffixes = [f'_ma{w}' for w in windows] + [f'_ewm{span}' for span in spans]
+    else:
+        raise ValueError('Expecting windows to be either all numbers of rows, or all time offsets')
+
+    if isinstance(window, (int, str)) and not spans:
+        return pd.DataFrame(output, index=df.index, columns=df.columns)
+    columns = [f'{col}{suffix}' for suffix in suffixes for col in df.columns]
+    return pd.DataFrame(output, index=df.index, columns=columns)
+
+
+class IncrementalMovingAverage:
+    """Moving averages of a (ds, dim) panel which grows over time, updated from only its new rows.
+
+    For each dimension, only its last (window - 1) rows are kept, in a buffer padded with nulls, which is all that
+    the next window needs. The cost of an update depends on the number of new rows and of the dimensions they
+    touch, rather than on the length of the history. For the new rows, its output is the same as that of
+    multi_moving_average() over the whole history, up to floating-point rounding.
+
+    Args:
+        window: The number of rows in each window, or a list of windows to compute, as in multi_moving_average().
+        min_periods: The minimum number of non-null values in a window.
+
+    """
+
+    def __init__(self, window: Union[int, List[int]] = 7, min_periods: int = 1) -> None:
+        """Initialize with an empty history."""
+        self.window = window
+        self.min_periods = min_periods
+        self.columns: Optional[pd.Index] = None
+        self.dims = pd.Index([], dtype=object)
+        self.buffer = np.empty((0, 0, 0))  # shaped by the window and columns in the first update
+        self.last_ds: Optional[np.ndarray] = None
+
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """Add rows to the history, and return their moving averages.
+
+        Args:
+            new_rows: A DataFrame like the input of multi_moving_average(), with the same columns in every update.
+                For each dimension, its dates must be later than those of any previous update.
+
+        """
+
+        _check_panel(new_rows)
+        windows = [self.window] if isinstance(self.window, int) else list(self.window)
+        if self.columns is None:
+            self.columns = new_rows.columns
+            self.buffer = np.empty((0, max(windows) - 1, new_rows.shape[1]))
+        elif not new_rows.columns.equals(self.columns):
+            raise ValueError('Expecting the same columns as in previous updates')
+
+        new_rows = new_rows.sort_index()
+        dim_values = new_rows.index.get_level_values(1)
+        ds = new_rows.index.get_level_values(0).to_numpy()
+        last_ds = ds[:0] if self.last_ds is None else self.last_ds
+
+        codes = self.dims.get_indexer(dim_values)
+        is_seen = codes >= 0
+        if (ds[is_seen] <= last_ds[codes[is_seen]]).any():
+            raise ValueError('Expecting new rows to be later than any previous rows of the same dimension')
+
+        new_dims = pd.Index(dim_values[~is_seen & dim_values.notna()].unique())
+        if len(new_dims):
+            self.dims = self.dims.append(new_dims)
+            self.buffer = np.concatenate([self.buffer, np.full((len(new_dims),) + self.buffer.shape[1:], np.nan)])
+            last_ds = np.concatenate([last_ds, ds[: len(new_dims)]])  # placeholders, set below
+            codes = self.dims.get_indexer(dim_values)
+
+        # the buffer of each dimension precedes its new rows, which are in order of ds
+        touched = np.unique(codes[codes >= 0])
+        n_keep = self.buffer.shape[1]
+        all_codes = np.concatenate([np.repeat(touched, n_keep), codes])
+        values = np.concatenate(
+            [self.buffer[touched].reshape(-1, len(self.columns)), new_rows.to_numpy(dtype='float64', na_value=np.nan)]
+        )
+        output, suffixes = _moving_averages(values, all_codes, windows, self.min_periods, [])
+        output = output[touched.shape[0] * n_keep:]
+
+        # keep the last rows of each touched dimension, the very last of which is its latest new row
+        order = np.argsort(all_codes, kind='stable')
+        ends = np.searchsorted(all_codes[order], touched, side='right')
+        self.buffer[touched] = values[order[ends[:, None] - n_keep + np.arange(n_keep)]]
+        last_ds[touched] = ds[order[ends - 1] - touched.shape[0] * n_keep]
+        self.last_ds = last_ds
+
+        if isinstance(self.window, int):
+            return pd.DataFrame(output, index=new_rows.index, columns=new_rows.columns)
+        columns = [f'{col}{suffix}' for suffix in suffixes for col in new_rows.columns]
+        return pd.DataFrame(output, index=new_rows.index, columns=columns)
+
+    def save(self, path: str) -> None:
+        """Save the state of the moving averages to a file, to be loaded by the next run."""
+        state = {key: getattr(self, key) for key in ('window', 'min_periods', 'columns', 'dims', 'buffer', 'last_ds')}
+        pd.to_pickle(state, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalMovingAverage':
+        """Load the state of moving averages saved by a previous run."""
+        state = pd.read_pickle(path)
+        moving_average = cls(window=state.pop('window'), min_periods=state.pop('min_periods'))
+        for key, value in state.items():
+            setattr(moving_average, key, value)
+        return moving_average
 
 
 if __name__ == '__main__':
@@ -1,38 +1,220 @@
 """ Various utility functions, mostly used within the rest of the diglett module. """
 
+from collections import deque
 import functools
+import json
 import time
-from typing import Any, Callable
+import tracemalloc
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
-from IPython.core.display import display, HTML
+import pandas as pd
 
+from .output import display, HTML
 
-def describe(func: Callable) -> Callable:
-    """Describe the shape of the input shape, output shape, and time of a pandas pipe function."""
 
-    @functools.wraps(func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        pre_shape = str(args[0].shape)
-        n_rows = args[0].shape[0]
-        start_ts = time.time()
+PROFILE_FIELDS = [
+    'func',
+    'start',
+    'n_rows',
+    'pre_shape',
+    'post_shape',
+    'wall_sec',
+    'cpu_sec',
+    'peak_mem_bytes',
+    'mem_in_bytes',
+    'mem_out_bytes',
+    'rows_per_sec',
+]
 
-        result = func(*args, **kwargs)
 
-        try:
-            post_shape = str(result.shape)
-        except AttributeError:
-            post_shape = 'NA'
+class ProfileCollector:
+    """In-process store for the profiling records produced by describe().
+
+    Args:
+        maxlen: If set, only the most recent records are kept, so the collector can be left on indefinitely.
+
+    """
+
+    def __init__(self, maxlen: Optional[int] = None) -> None:
+        """Initialize an empty collector."""
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        """Return the number of records held."""
+        return len(self.records)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Append a single profiling record."""
+        self.records.append(record)
+
+    def clear(self) -> None:
+        """Drop all records collected so far."""
+        self.records.clear()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the collected records as a DataFrame, one row per call."""
+        return pd.DataFrame(list(self.records), columns=PROFILE_FIELDS)
+
+    def to_json(self, path: Optional[str] = None) -> Optional[str]:
+        """Dump the collected records as JSON, either to a file or as a string."""
+        if path is None:
+            return json.dumps(list(self.records))
+        with open(path, 'w') as f:
+            json.dump(list(self.records), f)
+        return None
+
+
+default_collector = ProfileCollector(maxlen=10_000)
+
+# the highest traced memory of each call being profiled, from before any nested call reset the peak
+_peak_stack: List[int] = []
 
-        end_ts = time.time()
-        sec = end_ts - start_ts
-        sec_per_mille = (sec / n_rows) * 1000
 
-        print(f'{func.__name__}')
-        print(f'  Shape: {pre_shape} → {post_shape}')
-        print(f'  Time: {sec:.2f}s ({sec_per_mille:.2f}s / 1k)')
-        return result
+def _shape(obj: Any) -> Optional[Tuple[int, ...]]:
+    """Return the shape of a pandas-like object, or None if it has none."""
+    return getattr(obj, 'shape', None)
 
-    return wrapper
+
+def _memory_usage(obj: Any) -> Optional[int]:
+    """Return the deep memory usage of a pandas object in bytes, or None if it can't be measured."""
+    try:
+        usage = obj.memory_usage(deep=True)
+    except (AttributeError, TypeError):
+        return None
+    return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+
+
+def profile_call(
+    func: Callable,
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    trace_memory: bool = True,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Call a function and measure its wall time, CPU time and memory footprint.
+
+    The first positional argument is assumed to be the pandas object being operated on.
+
+    Args:
+        func: The function to call.
+        args: Positional arguments passed to func.
+        kwargs: Keyword arguments passed to func.
+        trace_memory: Whether to track peak allocations with tracemalloc, which slows down the call.
+
+    Returns:
+        A tuple of (result of the call, profiling record).
+
+    """
+
+    kwargs = kwargs or {}
+    data = args[0] if args else None
+    pre_shape = _shape(data)
+    n_rows = pre_shape[0] if pre_shape else None
+    mem_in = _memory_usage(data)
+
+    # if tracing is already on (e.g. nested calls), leave it running, and measure the peak from the start of
+    # this call: the peak is reset, and the highest memory so far is carried over to the outer call
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    can_reset = hasattr(tracemalloc, 'reset_peak')  # Python 3.9+
+    if trace_memory:
+        if _peak_stack:
+            _peak_stack[-1] = max(_peak_stack[-1], tracemalloc.get_traced_memory()[1])
+        if can_reset:
+            tracemalloc.reset_peak()
+        mem_baseline = tracemalloc.get_traced_memory()[0]
+        _peak_stack.append(mem_baseline)
+
+    start_ts = time.time()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        wall_sec = time.perf_counter() - start_wall
+        cpu_sec = time.process_time() - start_cpu
+        peak_mem = None
+        if trace_memory:
+            peak_abs = max(_peak_stack.pop(), tracemalloc.get_traced_memory()[1])
+            if _peak_stack:
+                _peak_stack[-1] = max(_peak_stack[-1], peak_abs)
+            # without reset_peak(), the peak of a call which didn't start tracing may predate it
+            if can_reset or started_tracing:
+                peak_mem = max(peak_abs - mem_baseline, 0)
+        if started_tracing:
+            tracemalloc.stop()
+
+    post_shape = _shape(result)
+
+    record = {
+        'func': getattr(func, '__name__', repr(func)),
+        'start': start_ts,
+        'n_rows': n_rows,
+        'pre_shape': str(pre_shape) if pre_shape is not None else 'NA',
+        'post_shape': str(post_shape) if post_shape is not None else 'NA',
+        'wall_sec': wall_sec,
+        'cpu_sec': cpu_sec,
+        'peak_mem_bytes': peak_mem,
+        'mem_in_bytes': mem_in,
+        'mem_out_bytes': _memory_usage(result),
+        'rows_per_sec': n_rows / wall_sec if (n_rows is not None and wall_sec > 0) else None,
+    }
+    return result, record
+
+
+def _print_record(record: Dict[str, Any]) -> None:
+    """Print a profiling record in a compact, human-readable form."""
+    sec = record['wall_sec']
+    sec_per_mille = (sec / record['n_rows']) * 1000 if record['n_rows'] else float('nan')
+
+    print(f'{record["func"]}')
+    print(f'  Shape: {record["pre_shape"]} → {record["post_shape"]}')
+    print(f'  Time: {sec:.2f}s ({sec_per_mille:.2f}s / 1k)')
+    print(f'  CPU: {record["cpu_sec"]:.2f}s')
+
+    if record['mem_in_bytes'] is not None or record['mem_out_bytes'] is not None:
+        mem_in = (record['mem_in_bytes'] or 0) / 10 ** 6
+        mem_out = (record['mem_out_bytes'] or 0) / 10 ** 6
+        peak = '' if record['peak_mem_bytes'] is None else f' (peak: {record["peak_mem_bytes"] / 10 ** 6:.2f} MB)'
+        print(f'  Memory: {mem_in:.2f} MB → {mem_out:.2f} MB{peak}')
+
+
+def describe(
+    func: Optional[Callable] = None,
+    *,
+    verbose: bool = True,
+    trace_memory: bool = False,
+    collector: Optional[ProfileCollector] = None,
+) -> Callable:
+    """Profile the shape, time and memory of a pandas pipe function.
+
+    Can be used either bare (``@describe``) or with arguments (``@describe(verbose=False)``).
+    Every call is recorded in a ProfileCollector, by default ``utils.default_collector``.
+
+    Args:
+        func: The function to decorate.
+        verbose: Whether to print a summary of each call to stdout.
+        trace_memory: Whether to track peak allocations with tracemalloc, which slows down the call. Off by
+            default, so that decorated functions can be left in production code.
+        collector: Where to record each call. Defaults to ``utils.default_collector``.
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            result, record = profile_call(func, args, kwargs, trace_memory=trace_memory)
+            (collector if collector is not None else default_collector).add(record)
+            if verbose:
+                _print_record(record)
+            return result
+
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
 
 
 def text_header(text: str, line_char: str = '-') -> None:
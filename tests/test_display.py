@@ -0,0 +1,28 @@
+"""Tests related to the output backends used by display()."""
+
+import pandas as pd
+
+from diglett import output
+
+
+def test_display_text_backend(capsys):
+    """Check that outside a notebook, HTML and Styler objects are displayed as plain text."""
+    assert output.get_display_backend() == 'text'
+
+    output.display(output.HTML('<div class="alert">✅ &nbsp; All good</div>'))
+    output.display(pd.DataFrame({'num_': [1, 2]}).style)
+
+    assert capsys.readouterr().out == '✅ \xa0 All good\n   num_\n0     1\n1     2\n'
+
+
+def test_display_log_backend(capsys, caplog):
+    """Check that the log backend writes to the 'diglett' logger instead of stdout."""
+    output.set_display_backend('log')
+    try:
+        with caplog.at_level('INFO', logger='diglett'):
+            output.display(output.HTML('<h2>Header</h2>'))
+    finally:
+        output.set_display_backend(None)
+
+    assert capsys.readouterr().out == ''
+    assert caplog.messages == ['Header']
@@ -62,3 +62,42 @@ def test_show_top_n_with_srs():
 
     print(actual)
     assert dedent(actual) == dedent(expected).strip()
+
+
+def test_show_top_n_with_categorical_nulls():
+    """ Test with categorical input which contains nulls. """
+    input_df = pd.DataFrame(
+        {'dim_A': pd.Categorical(['A', None, 'C', 'D']), 'num_': [1, 6, 2, 1]}
+    )
+
+    expected = """
+    dim_A  num_  pct_
+    0  < NULL >     6   0.6
+    1         C     2   0.2
+    2         …     2   0.2
+    """
+
+    actual = show_top_n(input_df, n=2, show_output=False).to_string().strip()
+
+    print(actual)
+    assert dedent(actual) == dedent(expected).strip()
+
+
+def test_show_top_n_with_partition_by():
+    """ Test show_top_n() within each partition, with OTHER at the bottom of each. """
+    input_df = pd.DataFrame(
+        {'dim_A': list('XXXXYYY'), 'dim_B': list('ABCDABC'), 'num_': [1, 2, 3, 4, 5, 3, 2]}
+    )
+
+    expected = """
+    dim_A dim_B  num_  pct_
+    0     X     D     4   0.4
+    1     X     …     6   0.6
+    2     Y     A     5   0.5
+    3     Y     …     5   0.5
+    """
+
+    actual = show_top_n(input_df, n=1, show_output=False, partition_by=['dim_A']).to_string().strip()
+
+    print(actual)
+    assert dedent(actual) == dedent(expected).strip()
@@ -24,3 +24,12 @@ def test_fillnas_subset_with_zero(input_df):
     output = fillnas(input_df, subset=['B', 'C'])
     assert output.isnull().sum().sum() == 1
     assert (output == 0).sum().sum() == 3
+
+
+def test_fillnas_inplace_with_dict(input_df):
+    """ Test with a dict of values per column, filled in place. """
+    output = fillnas(input_df, value={'A': -1, 'C': 10}, inplace=True)
+    assert output is None
+    assert input_df['A'].tolist() == [1, 2, 3, -1]
+    assert input_df['B'].isnull().sum() == 2
+    assert input_df['C'].tolist() == [10, 2, 3, 4]
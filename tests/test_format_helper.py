@@ -3,7 +3,7 @@
 import pandas as pd
 import pytest
 
-from diglett.output import format_helper
+from diglett.output import format_helper, HTML, render_table
 
 
 @pytest.fixture
@@ -42,3 +42,46 @@ def test_format_helper_styler_input(input_df: pd.DataFrame):
     assert styler.data.sum().sum() == 12.7
     if pd.__version__ >= '1.3.0':
         assert styler.hide_index_ == True
+
+
+def test_format_helper_max_rows():
+    """Test that format_helper() formats only the head and tail of a large DataFrame, or a single page."""
+    df = pd.DataFrame({'num_': range(1000), 'pct_': 0.5})
+
+    styler = df.pipe(format_helper, max_rows=10, hide_index=False, return_output=True)
+    assert styler.data['num_'].tolist() == [0, 1, 2, 3, 4, 995, 996, 997, 998, 999]
+    assert styler.caption == 'Rows 1–5 and 996–1,000 of 1,000'
+
+    styler = df.pipe(format_helper, page=2, page_size=300, hide_index=False, return_output=True)
+    assert styler.data['num_'].tolist() == list(range(600, 900))
+    assert styler.caption == 'Rows 601–900 of 1,000 (page 3 of 4)'
+
+    with pytest.raises(ValueError):
+        df.pipe(format_helper, page=4, page_size=300, return_output=True)
+
+
+def test_render_table(input_df: pd.DataFrame):
+    """Test that render_table() applies the same formats as format_helper(), as HTML or plain text."""
+    df = input_df.assign(dim_='<table>', delta_=[0.1, -0.2, 0, 1])
+
+    text = render_table(df, delta_cols=['delta_'], caption='Rows 1–4 of 4', text=True)
+    assert isinstance(text, str)
+    assert text.splitlines() == [
+        'num_    pct_  dim_       delta_',
+        '   1  90.00%  <table>   +10.00%',
+        '   2  90.00%  <table>   -20.00%',
+        '   3  80.00%  <table>    +0.00%',
+        '   4  10.00%  <table>  +100.00%',
+        'Rows 1–4 of 4',
+    ]
+
+    output = render_table(df, delta_cols=['delta_'], table_attrs='style="display:inline"')
+    assert isinstance(output, HTML)
+    html = output.data
+    assert '<td>1</td><td>90.00%</td><td>&lt;table&gt;</td><td>+10.00%</td>' in html
+    assert 'style="display:inline"' in html
+
+    # outside a notebook, the fast engine of format_helper() renders plain text
+    fast_text = df.pipe(format_helper, delta_cols=['delta_'], engine='fast', return_output=True)
+    assert isinstance(fast_text, str)
+    assert fast_text.splitlines() == text.splitlines()[:-1]
@@ -4,7 +4,7 @@ from textwrap import dedent
 
 import pandas as pd
 
-from diglett.group import group_other
+from diglett.group import group_other, group_other_streaming
 
 
 def test_group_other_with_df_1d():
@@ -75,3 +75,98 @@ def test_group_other_with_srs():
 
     print(actual)
     assert dedent(actual) == dedent(expected).strip('\n')
+
+
+def test_group_other_with_nulls_in_sort_col():
+    """Test that group_other() ranks nulls last, filling the top N with them in their original order."""
+    input_df = pd.DataFrame({'dim_A': list('ABCDE'), 'num_': [None, 2, None, 1, None]})
+
+    expected = """
+      dim_A  num_
+    0     B   2.0
+    1     D   1.0
+    2     A   0.0
+    3     …   0.0
+    """
+
+    actual = group_other(input_df, n=3).to_string().strip('\n')
+
+    print(actual)
+    assert dedent(actual) == dedent(expected).strip('\n')
+
+
+def test_group_other_with_ties_in_sort_col():
+    """Test that group_other() breaks ties at the N-th value by first appearance, like a stable sort_values()."""
+    input_df = pd.DataFrame({'dim_A': list('ABCDEF'), 'num_': [3, 5, 3, 3, 1, 3]})
+
+    expected = """
+      dim_A  num_
+    0     …     7
+    1     B     5
+    2     A     3
+    3     C     3
+    """
+
+    actual = group_other(input_df, n=3).to_string().strip('\n')
+
+    assert dedent(actual) == dedent(expected).strip('\n')
+
+
+def test_group_other_streaming_exact():
+    """Test that group_other_streaming() matches group_other() when all values fit in the summary."""
+    input_df = pd.DataFrame(
+        {'dim_A': list('ABCABCABC'), 'dim_B': list('XXXYYYZZZ'), 'num_': range(1, 10)}
+    )
+    chunks = [input_df.iloc[:4], input_df.iloc[4:]]
+
+    expected = group_other(input_df, n=5)
+    actual = group_other_streaming(chunks, n=5)
+
+    assert actual[['dim_A', 'dim_B']].equals(expected[['dim_A', 'dim_B']])
+    assert (actual['num_'] == expected['num_']).all()
+    assert (actual['lower_'] == actual['upper_']).all()
+
+
+def test_group_other_streaming_null_dims():
+    """Test that group_other_streaming() drops rows with a null dimension, like group_other()."""
+    input_df = pd.DataFrame({'dim_A': ['A', 'B', None, 'C', 'D', None], 'num_': [10, 9, 8, 1, 1, 1]})
+
+    expected = group_other(input_df, n=10)
+    actual = group_other_streaming([input_df.iloc[:3], input_df.iloc[3:]], n=10)
+
+    assert actual['dim_A'].tolist() == expected['dim_A'].tolist() == ['A', 'B', 'C', 'D']
+    assert (actual['num_'] == expected['num_']).all()
+
+
+def test_group_other_streaming_bounds():
+    """Test that group_other_streaming() bounds contain the true totals when the summary is too small."""
+    input_df = pd.DataFrame({'dim_A': list('AABACADAEAFAGH'), 'num_': 1})
+    chunks = [input_df.iloc[i:i + 3] for i in range(0, input_df.shape[0], 3)]
+
+    actual = group_other_streaming(chunks, n=1, capacity=3).set_index('dim_A')
+
+    assert actual.index.tolist() == ['…', 'A']
+    assert actual.loc['A', 'lower_'] <= 7 <= actual.loc['A', 'upper_']
+    assert actual.loc['…', 'lower_'] <= 7 <= actual.loc['…', 'upper_']
+
+
+def test_group_other_with_partition_by():
+    """Test group_other() keeping the top N within each partition."""
+    input_df = pd.DataFrame(
+        {'dim_A': list('XXXXYYY'), 'dim_B': list('ABCDABC'), 'num_': [4, 3, 2, 1, 1, 5, 3]}
+    )
+
+    expected = """
+      dim_A dim_B  num_
+    0     X     A     4
+    1     X     B     3
+    2     X     …     3
+    3     Y     B     5
+    4     Y     C     3
+    5     Y     …     1
+    """
+
+    actual = group_other(input_df, n=2, partition_by=['dim_A']).to_string().strip('\n')
+
+    print(actual)
+    assert dedent(actual) == dedent(expected).strip('\n')
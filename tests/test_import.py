@@ -0,0 +1,32 @@
+"""Tests related to importing diglett, e.g. in batch jobs without IPython."""
+
+import subprocess
+import sys
+
+import diglett
+
+SUBMODULES = ', '.join(f'diglett.{name}' for name in diglett.__all__)
+
+
+def _run(code: str) -> str:
+    """Run some code in a fresh interpreter, and return its stdout."""
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, check=True, text=True).stdout
+
+
+def test_import_without_ipython():
+    """Check that importing every submodule does not import IPython (or jinja2, via pandas Styler)."""
+    actual = _run(f'import sys, {SUBMODULES}; print("IPython" in sys.modules, "jinja2" in sys.modules)')
+    assert actual.strip() == 'False False'
+
+
+def test_import_time():
+    """Check that importing diglett adds little on top of importing pandas itself."""
+    code = f'import time, pandas; start = time.perf_counter(); import {SUBMODULES}; print(time.perf_counter() - start)'
+    import_sec = float(_run(code))
+    assert import_sec < 0.5
+
+
+def test_lazy_submodules():
+    """Check that submodules are only imported on first attribute access."""
+    actual = _run('import sys, diglett; print("diglett.eda" in sys.modules, diglett.eda.__name__)')
+    assert actual.strip() == 'False diglett.eda'
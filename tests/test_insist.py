@@ -1,9 +1,20 @@
 """Tests related to insist sub-module."""
 
+import functools
+
 import pandas as pd
 import pytest
 
-from diglett.insist import average_greater_than, less_than_pct_null, more_than_pct_unique, no_nulls
+from diglett.insist import (
+    average_greater_than,
+    CheckSuite,
+    less_than_pct_null,
+    more_than_pct_unique,
+    no_nulls,
+    PartialStats,
+    scan_unique,
+    values_between,
+)
 
 
 @pytest.fixture
@@ -94,3 +105,81 @@ def test_average_greater_than(input_df: pd.DataFrame):
     actual = input_df.pipe(average_greater_than, col='E', threshold=0.5, return_alert=True).data
 
     assert actual == expected
+
+
+def test_values_between(input_df: pd.DataFrame):
+    """Succeeds if values_between(col, lower, upper) returns specific HTML."""
+
+    expected = (
+        '<div class="alert alert-danger" style="margin: 5px;">'
+        '☠️ &nbsp; Values of D range from 1 to 3. Bounds are 1 and 2.</div>'
+    )
+    actual = input_df.pipe(values_between, col='D', lower=1, upper=2, return_alert=True).data
+
+    assert actual == expected
+
+
+def test_check_suite(input_df: pd.DataFrame):
+    """Succeeds if a CheckSuite computes each statistic once per column, and reports the same as each check."""
+
+    suite = (
+        CheckSuite()
+        .no_nulls()
+        .less_than_pct_null(['B'], pct=0.5)
+        .more_than_pct_unique('D')
+        .more_than_pct_unique('A')
+        .average_greater_than('E', 0.5)
+    )
+
+    stats = suite.statistics(input_df)
+    assert stats.index.tolist() == ['A', 'B', 'C', 'D', 'E']
+    assert stats.loc['D', ['n_rows', 'n_null', 'n_unique']].tolist() == [4, 0, 3]
+    assert stats['mean'].notnull().tolist() == [False, False, False, False, True]
+
+    report = suite.run(input_df)
+    assert report['check'].tolist() == [
+        'no_nulls', 'less_than_pct_null', 'more_than_pct_unique', 'more_than_pct_unique', 'average_greater_than'
+    ]
+    assert report['passed'].tolist() == [False, True, False, True, True]
+    assert report.at[0, 'message'] == 'More than 0% null values in cols: B, C'
+    assert input_df.pipe(suite) is input_df
+
+
+@pytest.mark.parametrize('distinct', ['exact', 'hll'])
+def test_check_suite_chunks(input_df: pd.DataFrame, distinct: str):
+    """Succeeds if checks of chunks, in sequence or merged from separate partial statistics, match the whole."""
+
+    suite = CheckSuite().less_than_pct_null(pct=0.5).more_than_pct_unique('D', 0.75).average_greater_than('E', 0.5)
+    chunks = [input_df.iloc[:1], input_df.iloc[1:3], input_df.iloc[3:]]
+
+    expected = suite.run(input_df)
+    pd.testing.assert_frame_equal(suite.run(iter(chunks), distinct=distinct), expected)
+
+    partials = [suite.partial(chunk, distinct=distinct) for chunk in chunks]
+    merged = functools.reduce(PartialStats.merge, partials[::-1])
+    pd.testing.assert_frame_equal(suite.evaluate(merged.statistics()), expected)
+
+
+def test_more_than_pct_unique_early_exit():
+    """Succeeds if more_than_pct_unique(early_exit=True) stops once the outcome is certain, and reports rows scanned."""
+
+    df = pd.DataFrame({'key': [1, 1, 1, 1] + list(range(2, 98))})
+
+    expected = (
+        '<div class="alert alert-danger" style="margin: 5px;">'
+        '☠️ &nbsp; Cardinality: at most 97.00% of values in key are unique, from 6 of 100 rows. '
+        'Threshold set is 99.00%.</div>'
+    )
+    actual = df.pipe(more_than_pct_unique, col='key', return_alert=True, early_exit=True, block_size=2).data
+
+    assert actual == expected
+
+    # blocks of 2, 4, 8, … rows: a pass is only certain once enough unique values are found
+    assert scan_unique(df['key'], pct=0.9, block_size=2) == (97, 100, 100)
+    assert scan_unique(df['key'], pct=0.98, block_size=2) == (3, 6, 100)
+
+    # an empty column fails the check in both modes, rather than dividing by zero
+    empty_df = df.iloc[:0]
+    for early_exit in [False, True]:
+        actual = empty_df.pipe(more_than_pct_unique, col='key', return_alert=True, early_exit=early_exit).data
+        assert 'alert-danger' in actual and 'nan%' in actual
@@ -1,9 +1,10 @@
 """ Tests related to multi_moving_average() function. """
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from diglett.transform import multi_moving_average
+from diglett.transform import IncrementalMovingAverage, multi_moving_average
 
 
 @pytest.fixture
@@ -31,3 +32,89 @@ def test_mma_correct_order(input_df):
 def test_mma_incorrect_order(input_df):
     """ Test with input index levels in incorrect order. """
     _ = multi_moving_average(input_df.swaplevel())
+
+
+@pytest.mark.parametrize('window, min_periods', [(2, 1), (3, 2), (7, 0)])
+def test_mma_matches_rolling(input_df, window, min_periods):
+    """ Test that the vectorized output matches a rolling mean per dimension, with nulls and min_periods. """
+    input_df = input_df.astype(float).sample(frac=1, random_state=0)
+    input_df.iloc[::4, 0] = np.nan
+
+    expected = (
+        input_df.sort_index()
+        .groupby(level=1)
+        .transform(lambda x: x.rolling(window=window, min_periods=min_periods).mean())
+    )
+    pd.testing.assert_frame_equal(multi_moving_average(input_df, window, min_periods), expected)
+
+
+def test_mma_exact_with_outlier():
+    """ Test that a large value doesn't spoil later windows, and that the output is exactly a rolling mean. """
+    input_df = pd.DataFrame(
+        {
+            'ds': pd.date_range(start='2021-01-01', periods=7).repeat(2),
+            'dim_A': list('AB') * 7,
+            'num_A': [1e20, 1.1, 1.0, 2.2, 2.0, 3.3, 3.0, 4.4, 4.0, 5.5, 5.0, 6.6, 6.0, 7.7],
+        }
+    ).set_index(['ds', 'dim_A'])
+
+    output_df = multi_moving_average(input_df, window=2)
+    expected = input_df.groupby(level=1).transform(lambda x: x.rolling(window=2, min_periods=1).mean())
+
+    pd.testing.assert_frame_equal(output_df, expected, check_exact=True)
+    assert output_df.xs('A', level=1)['num_A'].tolist()[2:] == [1.5, 2.5, 3.5, 4.5, 5.5]
+
+
+def test_mma_multiple_windows(input_df):
+    """ Test several windows and exponentially weighted averages at once, as wide suffixed columns. """
+    input_df = input_df.astype(float)
+    input_df.iloc[::5, 1] = np.nan
+
+    output_df = multi_moving_average(input_df, window=[2, 3], spans=[4])
+    assert output_df.columns.tolist() == [
+        'num_A_ma2', 'num_B_ma2', 'num_A_ma3', 'num_B_ma3', 'num_A_ewm4', 'num_B_ewm4'
+    ]
+
+    pd.testing.assert_frame_equal(
+        output_df[['num_A_ma3', 'num_B_ma3']].set_axis(input_df.columns, axis=1), multi_moving_average(input_df, 3)
+    )
+    expected = input_df.sort_index().groupby(level=1).transform(lambda x: x.ewm(span=4).mean())
+    pd.testing.assert_frame_equal(
+        output_df[['num_A_ewm4', 'num_B_ewm4']].set_axis(input_df.columns, axis=1), expected, check_exact=True
+    )
+
+
+def test_incremental_moving_average(input_df, tmp_path):
+    """ Test that updating moving averages one date at a time, with a saved state, matches the whole history. """
+    input_df = input_df.astype(float)
+    input_df.iloc[::5, 1] = np.nan
+    dates = input_df.index.get_level_values(0)
+
+    moving_average = IncrementalMovingAverage(window=[2, 3])
+    outputs = [moving_average.update(input_df[dates <= '2021-01-02'])]
+    for date in ['2021-01-03', '2021-01-04']:
+        moving_average.save(tmp_path / 'state.pkl')
+        moving_average = IncrementalMovingAverage.load(tmp_path / 'state.pkl')
+        outputs.append(moving_average.update(input_df[dates == date]))
+
+    pd.testing.assert_frame_equal(pd.concat(outputs), multi_moving_average(input_df, window=[2, 3]))
+
+    with pytest.raises(ValueError):
+        moving_average.update(input_df[dates == '2021-01-04'])
+
+
+def test_mma_time_based(input_df):
+    """ Test that a time-based window treats missing dates as nulls, like a time-based rolling mean. """
+    input_df = input_df.drop(pd.Timestamp('2021-01-02'), level=0)
+
+    expected = (
+        input_df.sort_index()
+        .groupby(level=1)
+        .transform(lambda x: x.droplevel(1).rolling('2D').mean().to_numpy())
+        .astype(float)
+    )
+    pd.testing.assert_frame_equal(multi_moving_average(input_df, window='2D'), expected)
+    assert (multi_moving_average(input_df, window='2D') != multi_moving_average(input_df, window=2)).any().any()
+
+    with pytest.raises(ValueError):
+        multi_moving_average(input_df, window=[2, '2D'])
@@ -0,0 +1,48 @@
+"""Tests related to the pipeline sub-module."""
+
+import pandas as pd
+import pytest
+
+from diglett.group import group_other
+from diglett.pipeline import Pipeline
+from diglett.transform import fillnas
+
+
+@pytest.fixture
+def input_df() -> pd.DataFrame:
+    """Create a DataFrame with columns: (dim_A, num_)."""
+    return pd.DataFrame({'dim_A': list('ABCDEFG'), 'num_': [1, 2, None, 4, 5, 6, 7]})
+
+
+def test_pipeline_run(input_df: pd.DataFrame):
+    """Check that a Pipeline returns the same output as the equivalent pipe() chain."""
+    pipeline = Pipeline().pipe(fillnas, subset=['num_']).pipe(group_other, n=3)
+
+    expected = input_df.pipe(fillnas, subset=['num_']).pipe(group_other, n=3)
+    actual = input_df.pipe(pipeline)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_pipeline_report(input_df: pd.DataFrame):
+    """Check that the report has one row per stage, with row-count changes."""
+    pipeline = Pipeline([(fillnas, {'subset': ['num_']}), (group_other, {'n': 3})])
+    pipeline.run(input_df)
+
+    report = pipeline.report().set_index('func')
+    assert report['rows_in'].to_dict() == {'fillnas': 7, 'group_other': 7}
+    assert report.loc['group_other', 'rows_delta'] == -3
+    assert report['pct_time'].sum() == pytest.approx(1)
+
+
+def test_pipeline_collapsed_stacks(input_df: pd.DataFrame):
+    """Check that collapsed stacks have one "frames value" line per stage."""
+    pipeline = Pipeline([fillnas], name='etl')
+    pipeline.run(input_df)
+
+    stacks = pipeline.collapsed_stacks(metric='peak_mem_bytes')
+    assert stacks is not None
+    lines = stacks.splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith('etl;0:fillnas ')
+    assert int(lines[0].split(' ')[-1]) > 0
@@ -0,0 +1,57 @@
+"""Tests related to the sketch sub-module."""
+
+import numpy as np
+import pandas as pd
+
+from diglett.sketch import HeavyHitters, HyperLogLog, QuantileSketch
+
+
+def test_heavy_hitters_merge():
+    """Check that merging summaries of two halves gives the same totals as summarizing the whole."""
+    counts = pd.Series([50, 30, 5, 4, 3, 2, 1], index=list('ABCDEFG'))
+
+    whole = HeavyHitters(capacity=3).update(counts)
+    merged = HeavyHitters(capacity=3).update(counts.iloc[::2]).merge(HeavyHitters(capacity=3).update(counts.iloc[1::2]))
+
+    for summary in (whole, merged):
+        assert summary.total == 95
+        assert summary.top(2).index.tolist() == ['A', 'B']
+        assert (summary.top(2) <= counts[['A', 'B']]).all()
+        assert (summary.top(2) + summary.error >= counts[['A', 'B']]).all()
+
+
+def test_quantile_sketch_merge():
+    """Check that quantiles of merged sketches are within the expected rank error, and exact for small inputs."""
+    np.random.seed(42)
+    values = np.random.exponential(size=100_000)
+
+    first, second = np.split(values, 2)
+    merged = QuantileSketch(k=1000, seed=0).update(first).merge(QuantileSketch(k=1000, seed=1).update(second))
+    assert merged.count == 100_000
+    for q, estimate in zip([0.01, 0.5, 0.99], merged.quantile([0.01, 0.5, 0.99])):
+        assert abs((values <= estimate).mean() - q) < 0.005
+
+    small = pd.Series(values[:100])
+    assert QuantileSketch().update(small).quantile(0.99) == small.quantile(0.99)
+
+
+def test_hyperloglog_merge():
+    """Check that distinct counts of merged sketches are within the expected error, whatever the dtype of chunks."""
+    np.random.seed(42)
+    values = np.random.randint(0, 10 ** 9, size=200_000)
+
+    first, second = np.split(values, 2)
+    merged = HyperLogLog().update(first).merge(HyperLogLog().update(pd.Series(second, dtype='float64')))
+    n_unique = np.unique(values).shape[0]
+    assert abs(merged.estimate() / n_unique - 1) < 0.03
+
+    assert round(HyperLogLog().update(pd.Series(['a', 'b', None, 'a'])).estimate()) == 2
+
+
+def test_hyperloglog_large_ints():
+    """Check that int64 values beyond the precision of a float64 are counted as distinct values."""
+    values = 10 ** 18 + np.arange(100_000)
+
+    estimate = HyperLogLog().update(values).estimate()
+
+    assert abs(estimate / values.shape[0] - 1) < 0.03
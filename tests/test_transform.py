@@ -3,7 +3,7 @@
 import numpy as np
 import pandas as pd
 
-from diglett.transform import winsorize
+from diglett.transform import complete_panel, winsorize, winsorize_df, winsorize_stream, winsorize_thresholds
 
 
 def test_winsorize():
@@ -15,3 +15,101 @@ def test_winsorize():
 
     output_srs = winsorize(input_srs)
     assert output_srs.max() == 3.511863363802606
+
+
+def test_winsorize_df():
+    """Check that winsorize_df() matches winsorize() on each column within each group, and reuses thresholds."""
+    np.random.seed(42)
+
+    input_df = pd.DataFrame(
+        {'country': np.random.choice(['CA', 'US'], size=200), 'x': np.random.exponential(size=200)}
+    ).assign(y=lambda df: df['x'] * 10)
+    output_df, thresholds = winsorize_df(input_df, by='country')
+
+    assert thresholds.index.names == ['country', 'column']
+    assert thresholds.columns.tolist() == ['lower', 'upper']
+    for _, group in input_df.groupby('country'):
+        expected = winsorize(group['y'], verbose=False)
+        pd.testing.assert_series_equal(output_df.loc[group.index, 'y'], expected)
+
+    reused_df, _ = winsorize_df(input_df, by='country', thresholds=thresholds)
+    pd.testing.assert_frame_equal(reused_df, output_df)
+
+
+def test_winsorize_df_null_groups():
+    """Check that winsorize_df() leaves values as is when every group key is null, so that there are no groups."""
+    input_df = pd.DataFrame({'g': [None, None], 'x': [1.0, 2.0]})
+
+    output_df, thresholds = winsorize_df(input_df, by='g')
+
+    pd.testing.assert_frame_equal(output_df, input_df)
+    assert thresholds.empty
+    assert thresholds.index.names == ['g', 'column']
+    assert thresholds.columns.tolist() == ['lower', 'upper']
+
+
+def test_winsorize_stream():
+    """Check that streaming winsorize fits thresholds over chunks, then clips each chunk, like winsorize_df()."""
+    np.random.seed(42)
+
+    input_df = pd.DataFrame({'x': np.random.exponential(size=500)})
+    thresholds = winsorize_thresholds(np.array_split(input_df, 5))
+    output_df = pd.concat(winsorize_stream(np.array_split(input_df, 5), thresholds))
+
+    # exact while the sketch holds every value
+    pd.testing.assert_frame_equal(thresholds, winsorize_df(input_df)[1])
+    pd.testing.assert_frame_equal(output_df, winsorize_df(input_df)[0])
+
+
+def test_complete_panel():
+    """Check that complete_panel() adds the missing dates of each dimension, only within its own date range."""
+    df = pd.DataFrame(
+        {
+            'ds': pd.to_datetime(['2021-01-01', '2021-01-03', '2021-01-02', '2021-01-05', '2021-01-02']),
+            'dim': list('AABBC'),
+            'num': [1, 2, 3, 4, 5],
+        }
+    ).set_index(['ds', 'dim'])
+
+    output_df = complete_panel(df, fill_value=0)
+    assert output_df.index.tolist() == [
+        (pd.Timestamp(ds), dim)
+        for ds, dim in [('2021-01-01', 'A'), ('2021-01-02', 'A'), ('2021-01-02', 'B'), ('2021-01-02', 'C'),
+                        ('2021-01-03', 'A'), ('2021-01-03', 'B'), ('2021-01-04', 'B'), ('2021-01-05', 'B')]
+    ]
+    assert output_df['num'].tolist() == [1, 0, 3, 5, 2, 0, 0, 4]
+    assert output_df['num'].dtype == 'int64'
+    assert complete_panel(df)['num'].isna().sum() == 3
+
+
+def test_complete_panel_dtypes():
+    """Check that complete_panel() fills datetime, bool, categorical and string columns as reindex() does."""
+    index = pd.MultiIndex.from_arrays(
+        [pd.to_datetime(['2021-01-01', '2021-01-03', '2021-01-02']), list('AAB')], names=['ds', 'dim']
+    )
+    df = pd.DataFrame(
+        {
+            'time': pd.to_datetime(['2020-01-01', '2020-01-02', '2020-01-03']),
+            'flag': [True, False, True],
+            'cat': pd.Categorical(['x', 'y', 'x']),
+            'text': ['p', 'q', 'r'],
+        },
+        index=index,
+    )
+    full_index = df.index.append(pd.MultiIndex.from_tuples([(pd.Timestamp('2021-01-02'), 'A')])).sort_values()
+
+    for fill_value in [np.nan, {'text': 'z', 'flag': False, 'cat': 'y'}]:
+        fills = fill_value if isinstance(fill_value, dict) else dict.fromkeys(df.columns, fill_value)
+        expected = pd.DataFrame(
+            {col: df[col].reindex(full_index, fill_value=fills.get(col, np.nan)) for col in df.columns}
+        )
+        pd.testing.assert_frame_equal(complete_panel(df, fill_value=fill_value), expected)
+
+    # a fill which a column can't hold upcasts it to object
+    output_df = complete_panel(df, fill_value='z')
+    assert (output_df.dtypes == object).all()
+    assert output_df.loc[(pd.Timestamp('2021-01-02'), 'A')].tolist() == ['z'] * 4
+
+    # without any rows to add, no column is upcast, even by a fill which it can't hold
+    for fill_value in [np.nan, 0]:
+        pd.testing.assert_series_equal(complete_panel(df.iloc[[0, 2]], fill_value=fill_value).dtypes, df.dtypes)
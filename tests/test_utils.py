@@ -1,8 +1,11 @@
 """Tests related to the utils sub-module."""
 
+import json
 import re
+import sys
 from textwrap import dedent
 
+import numpy as np
 import pandas as pd
 
 from diglett import utils
@@ -26,6 +29,56 @@ def test_describe_decorator(capsys):
     assert re.search(expected_pattern, actual)
 
 
+def test_describe_collector(capsys):
+    """Check that describe() records each call to a collector, and can run silently."""
+    input_df = pd.DataFrame({'dim_A': list('ABCABC'), 'num_1': range(1, 7)})
+    collector = utils.ProfileCollector()
+
+    @utils.describe(verbose=False, trace_memory=True, collector=collector)
+    def test_func(df):
+        return df.groupby('dim_A')['num_1'].sum()
+
+    _ = test_func(input_df)
+    _ = test_func(input_df)
+
+    assert capsys.readouterr().out == ''
+    assert len(collector) == 2
+
+    records = collector.to_frame()
+    assert records.columns.tolist() == utils.PROFILE_FIELDS
+    assert records['n_rows'].tolist() == [6, 6]
+    assert records['post_shape'].tolist() == ['(3,)', '(3,)']
+    assert (records['peak_mem_bytes'] > 0).all()
+    assert (records['mem_in_bytes'] > records['mem_out_bytes']).all()
+
+    assert json.loads(collector.to_json())[0]['func'] == 'test_func'
+
+
+def test_describe_nested_peak():
+    """Check that the peak memory of a nested call excludes allocations made by the outer call before it."""
+    collector = utils.ProfileCollector()
+
+    @utils.describe(verbose=False, trace_memory=True, collector=collector)
+    def inner(df):
+        return df.sum()
+
+    @utils.describe(verbose=False, trace_memory=True, collector=collector)
+    def outer(df):
+        big = np.ones(5_000_000)
+        del big
+        return inner(df)
+
+    outer(pd.DataFrame({'num_1': range(10)}))
+    records = collector.to_frame().set_index('func')
+    assert records.at['outer', 'peak_mem_bytes'] > 40_000_000
+    if sys.version_info >= (3, 9):
+        assert records.at['inner', 'peak_mem_bytes'] < 1_000_000
+
+    # tracing is off by default
+    utils.describe(verbose=False, collector=collector)(len)(pd.DataFrame())
+    assert collector.records[-1]['peak_mem_bytes'] is None
+
+
 def test_text_header(capsys):
     """Check that text_header() outputs to stdout in the expected manner."""
     utils.text_header('Meow')
@@ -1,9 +1,13 @@
 """Tests related to verbose_merge() function."""
 
+import os
+import re
+
 import numpy as np
 import pandas as pd
+import pytest
 
-from diglett.join import verbose_merge
+from diglett.join import MergeIndex, partitioned_merge, verbose_merge
 
 
 def test_verbose_merge(capsys):
@@ -18,3 +22,154 @@ def test_verbose_merge(capsys):
     assert output.index.tolist() == [1, 3, 5, 7, 9]
     assert 'Unique keys: (✅, ✅)' in stdout
     assert 'Nulls: (0, 0)' in stdout
+
+
+def test_verbose_merge_many_to_many(capsys):
+    """Check that verbose_merge() diagnostics count many-to-many and null key matches like an outer merge."""
+    df_A = pd.DataFrame({'key': ['a', 'a', 'b', None, 'c'], 'A': 1})
+    df_B = pd.DataFrame({'key': ['a', 'a', 'a', np.nan, 'd'], 'B': 2})
+
+    output = verbose_merge(df_A, df_B, left_on='key', right_on='key', how='inner')
+    stdout = capsys.readouterr().out
+    print(stdout)
+
+    assert output.shape[0] == 7
+    assert 'Unique keys: (❌, ❌)' in stdout
+    assert 'Max rows per key: (2, 3)' in stdout
+    assert 'Nulls: (1, 1)' in stdout
+    assert re.search(r'left_only\s+2\s', stdout)
+    assert re.search(r'both\s+7\s', stdout)
+    assert re.search(r'right_only\s+1\s', stdout)
+    assert 'Output rows: 7 ' in stdout
+
+
+@pytest.mark.xfail(raises=ValueError, strict=True)
+def test_verbose_merge_max_rows():
+    """Check that verbose_merge() refuses to run a merge which would produce more than max_rows rows."""
+    df_A = pd.DataFrame({'key': ['a'] * 1000, 'A': 1})
+    df_B = pd.DataFrame({'key': ['a'] * 1000, 'B': 2})
+
+    _ = verbose_merge(df_A, df_B, left_on='key', right_on='key', max_rows=10 ** 5)
+
+
+def test_verbose_merge_index(capsys):
+    """Check that merging against a MergeIndex matches pd.merge(), with the same diagnostics."""
+    df_A = pd.DataFrame({'key': ['a', 'b', 'b', None, 'c', 'e'], 'A': np.arange(6)})
+    df_B = pd.DataFrame({'key': ['a', 'b', 'b', np.nan, 'd'], 'B': np.arange(5)})
+    index = MergeIndex(df_B, on='key')
+
+    expected = pd.merge(df_A, df_B, on='key', how='left')
+    for _ in range(2):
+        actual = verbose_merge(df_A, index, left_on='key', how='left')
+        pd.testing.assert_frame_equal(actual, expected)
+
+    stdout = capsys.readouterr().out
+    print(stdout)
+    assert stdout.count('Unique keys: (❌, ❌)') == 2
+    assert 'Output rows: 8 ' in stdout
+
+
+def test_verbose_merge_index_inner_order():
+    """Check that an inner merge against a MergeIndex orders rows like pd.merge(), grouped by key."""
+    df_A = pd.DataFrame({'key': ['a', 'b', 'a', 'c', None, 'b', 'z'], 'A': np.arange(7)})
+    df_B = pd.DataFrame({'key': ['b', 'a', 'b', None, 'c'], 'B': np.arange(5)})
+
+    actual = verbose_merge(df_A, MergeIndex(df_B, on='key'), left_on='key', how='inner')
+    pd.testing.assert_frame_equal(actual, pd.merge(df_A, df_B, on='key', how='inner'))
+
+    df_A, df_B = df_A.set_index('key'), df_B.set_index('key')
+    actual = verbose_merge(df_A, MergeIndex(df_B), left_index=True, how='inner')
+    pd.testing.assert_frame_equal(actual, pd.merge(df_A, df_B, left_index=True, right_index=True, how='inner'))
+
+
+def test_verbose_merge_multi_column(capsys):
+    """Check that verbose_merge() on a composite key counts matches like pd.merge(), with nulls matching per column."""
+    df_A = pd.DataFrame({'k1': ['a', 'a', 'b', None, 'b'], 'k2': [1, 1, 2, 1, 3], 'A': 1})
+    df_B = pd.DataFrame({'k1': ['a', 'b', None, 'b'], 'k2': [1, 1, 1, 2], 'B': 2})
+
+    output = verbose_merge(df_A, df_B, left_on=['k1', 'k2'], right_on=['k1', 'k2'], how='left')
+    stdout = capsys.readouterr().out
+    print(stdout)
+
+    pd.testing.assert_frame_equal(output, pd.merge(df_A, df_B, on=['k1', 'k2'], how='left'))
+    assert 'Unique keys: (❌, ❌)' in stdout
+    assert 'Max rows per key: (2, 1)' in stdout
+    assert 'Nulls: (1, 1)' in stdout
+    assert re.search(r'left_only\s+1\s', stdout)
+    assert re.search(r'both\s+4\s', stdout)
+    assert re.search(r'right_only\s+1\s', stdout)
+
+
+@pytest.mark.parametrize('file_format', ['pickle', 'parquet'])
+def test_partitioned_merge(capsys, tmp_path, file_format: str):
+    """Check that partitioned_merge() matches pd.merge() and verbose_merge() diagnostics, in a process pool."""
+    if file_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            pytest.skip('parquet requires pyarrow')
+
+    df_A = pd.DataFrame({'key': ['a', 'a', 'b', None, 'c'] * 20, 'A': np.arange(100)})
+    df_B = pd.DataFrame({'key': ['a', 'b', np.nan, 'd'] * 5, 'B': np.arange(20)})
+
+    _ = verbose_merge(df_A, df_B, left_on='key', right_on='key', how='outer')
+    expected_stdout = capsys.readouterr().out
+
+    paths = partitioned_merge(
+        np.array_split(df_A, 4),
+        np.array_split(df_B, 3),
+        left_on='key',
+        right_on='key',
+        how='outer',
+        n_partitions=3,
+        processes=2,
+        spill_dir=str(tmp_path),
+        out_dir=str(tmp_path / 'output'),
+        file_format=file_format,
+    )
+    stdout = capsys.readouterr().out
+    print(stdout)
+
+    output = pd.concat([pd.read_pickle(p) if file_format == 'pickle' else pd.read_parquet(p) for p in paths])
+    expected = pd.merge(df_A, df_B, on='key', how='outer')
+    sort_cols = ['A', 'B']
+    pd.testing.assert_frame_equal(
+        output.sort_values(sort_cols).reset_index(drop=True), expected.sort_values(sort_cols).reset_index(drop=True)
+    )
+    assert stdout.splitlines()[:3] == expected_stdout.splitlines()[:3]
+    assert f'Output rows: {expected.shape[0]:,}' in stdout
+    assert sorted(os.listdir(tmp_path)) == ['output']
+
+
+def test_partitioned_merge_mixed_key_dtypes():
+    """Check that partitioned_merge() matches int keys with float keys, when chunks have different dtypes."""
+    df_A = pd.DataFrame({'key': np.arange(40) % 10, 'A': np.arange(40)})
+    df_B = pd.DataFrame({'key': np.arange(10), 'B': np.arange(10)})
+    left_chunks = [df_A.iloc[:20], df_A.iloc[20:].astype({'key': 'float64'})]
+    right_chunks = [df_B.iloc[:5].astype({'key': 'float64'}), df_B.iloc[5:].astype({'key': 'Int64'})]
+
+    output = pd.concat(
+        partitioned_merge(
+            left_chunks, right_chunks, left_on='key', right_on='key', n_partitions=4, file_format='pickle'
+        )
+    )
+
+    assert sorted(zip(output['A'], output['B'])) == [(a, a % 10) for a in range(40)]
+
+
+def test_partitioned_merge_cleanup(tmp_path):
+    """Check that the spill directory is deleted when the output is closed before every partition is read."""
+    df = pd.DataFrame({'key': np.arange(100), 'A': np.arange(100)})
+
+    with partitioned_merge(
+        [df], [df], left_on='key', right_on='key', n_partitions=4, spill_dir=str(tmp_path), file_format='pickle'
+    ) as output:
+        next(output)
+        assert len(os.listdir(tmp_path)) == 1
+    assert os.listdir(tmp_path) == []
+
+    output = partitioned_merge(
+        [df], [df], left_on='key', right_on='key', n_partitions=4, spill_dir=str(tmp_path), file_format='pickle'
+    )
+    del output
+    assert os.listdir(tmp_path) == []